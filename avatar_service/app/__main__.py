@@ -0,0 +1,27 @@
+"""
+Launch the avatar service with a worker count matched to the CPU layout.
+
+    python -m app            # from avatar_service/
+"""
+
+import os
+
+import uvicorn
+
+from .topology import choose_layout, export_worker_count
+
+
+def main():
+    layout = choose_layout(planning=True)
+    # Each worker sizes OpenCV from this; without it they'd assume they're alone.
+    export_worker_count(layout)
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("AVATAR_HOST", "0.0.0.0"),
+        port=int(os.getenv("AVATAR_PORT", "8001")),
+        workers=layout.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Frame handling for animated (GIF / WebP) avatars.
+
+Frames are decoded fully composited, capped at a maximum count (dropped
+frames lend their display time to the frame kept before them, so the
+animation keeps its total length), de-duplicated by content hash so
+identical frames are rendered once, and finally reassembled in the source
+format with the original per-frame durations and loop count.
+"""
+
+import hashlib
+import io
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+ANIMATED_FORMATS = {"GIF": "gif", "WEBP": "webp"}
+DEFAULT_FRAME_MS = 100
+
+
+@dataclass
+class Animation:
+    frames: List[Image.Image]      # RGB, after the frame cap
+    durations: List[int]           # milliseconds, one per frame
+    loop: int                      # 0 = forever
+    format: str                    # "GIF" or "WEBP"
+    source_frames: int             # frame count before the cap
+
+
+def animated_format(data) -> Optional[str]:
+    """Return "GIF" / "WEBP" for a multi-frame upload, else None."""
+    try:
+        img = Image.open(io.BytesIO(data))
+    except Exception:
+        return None
+    if img.format in ANIMATED_FORMATS and getattr(img, "n_frames", 1) > 1:
+        return img.format
+    return None
+
+
+def extract_frames(data, max_frames: int) -> Animation:
+    """Decode every frame, keeping at most ``max_frames`` evenly spaced ones."""
+    img = Image.open(io.BytesIO(data))
+    loop = int(img.info.get("loop", 0))
+    source_frames = img.n_frames
+    step = max(1, math.ceil(source_frames / max_frames))
+
+    frames: List[Image.Image] = []
+    durations: List[int] = []
+    for index, frame in enumerate(ImageSequence.Iterator(img)):
+        frame.load()  # WebP only reports a frame's duration once decoded
+        duration = int(frame.info.get("duration") or DEFAULT_FRAME_MS)
+        if index % step == 0:
+            frames.append(frame.convert("RGB"))
+            durations.append(duration)
+        else:
+            durations[-1] += duration
+    return Animation(frames, durations, loop, img.format, source_frames)
+
+
+def dedupe(frames: Sequence[np.ndarray]) -> Tuple[List[np.ndarray], List[int]]:
+    """
+    Return the distinct frames and, for every input frame, the index of
+    its distinct frame.
+    """
+    seen = {}
+    unique: List[np.ndarray] = []
+    mapping: List[int] = []
+    for frame in frames:
+        key = hashlib.blake2b(frame.tobytes(), digest_size=16).digest()
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(frame)
+        mapping.append(seen[key])
+    return unique, mapping
+
+
+def assemble(frames: Sequence[np.ndarray], durations: Sequence[int], loop: int, fmt: str) -> bytes:
+    """Encode RGB frames as an animated image in ``fmt`` ("GIF" or "WEBP")."""
+    images = [Image.fromarray(frame) for frame in frames]
+    output = io.BytesIO()
+    options = {"lossless": False, "quality": 85, "method": 4} if fmt == "WEBP" else {"disposal": 2}
+    images[0].save(
+        output,
+        format=fmt,
+        save_all=True,
+        append_images=images[1:],
+        duration=list(durations),
+        loop=loop,
+        **options,
+    )
+    return output.getvalue()
@@ -0,0 +1,150 @@
+"""
+Load-adaptive quality ladder.
+
+The controller watches how many generations are in flight and how long
+recent ones took, and walks down a ladder of progressively cheaper
+generation settings when the service is under pressure — and back up once
+the pressure is gone. Separate high/low thresholds plus a longer cooldown
+for stepping up keep it from flapping between two rungs.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Rung:
+    name: str
+    engine: str                       # "huggingface" or "opencv"
+    size: Tuple[int, int]             # preprocessing target size
+    upscale: float = 2.0              # opencv internal resolution factor
+    bilateral_passes: int = 4         # opencv colour smoothing passes
+
+
+DEFAULT_LADDER: Tuple[Rung, ...] = (
+    Rung("hf-512", "huggingface", (512, 512)),
+    Rung("hf-384", "huggingface", (384, 384)),
+    Rung("opencv-full", "opencv", (512, 512)),
+    Rung("opencv-cheap", "opencv", (512, 512), upscale=0.5, bilateral_passes=2),
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class DegradationController:
+    """
+    ``admit()`` is called when a request starts and returns the rung to
+    use; ``release()`` is called when it finishes with its latency.
+    """
+
+    def __init__(
+        self,
+        ladder: Sequence[Rung] = DEFAULT_LADDER,
+        *,
+        high_depth: int = 4,
+        low_depth: int = 1,
+        high_latency: float = 20.0,
+        low_latency: float = 8.0,
+        window: int = 20,
+        down_cooldown: float = 2.0,
+        up_cooldown: float = 15.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not ladder:
+            raise ValueError("ladder must contain at least one rung")
+        self.ladder = tuple(ladder)
+        self.high_depth = high_depth
+        self.low_depth = low_depth
+        self.high_latency = high_latency
+        self.low_latency = low_latency
+        self.down_cooldown = down_cooldown
+        self.up_cooldown = up_cooldown
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._index = 0
+        self._in_flight = 0
+        self._last_change = clock()
+
+    @classmethod
+    def from_env(cls) -> "DegradationController":
+        return cls(
+            high_depth=int(_env_float("AVATAR_LADDER_HIGH_DEPTH", 4)),
+            low_depth=int(_env_float("AVATAR_LADDER_LOW_DEPTH", 1)),
+            high_latency=_env_float("AVATAR_LADDER_HIGH_LATENCY", 20.0),
+            low_latency=_env_float("AVATAR_LADDER_LOW_LATENCY", 8.0),
+            down_cooldown=_env_float("AVATAR_LADDER_DOWN_COOLDOWN", 2.0),
+            up_cooldown=_env_float("AVATAR_LADDER_UP_COOLDOWN", 15.0),
+            enabled=os.getenv("AVATAR_LADDER_ENABLED", "1") != "0",
+        )
+
+    @property
+    def current(self) -> Rung:
+        return self.ladder[self._index]
+
+    def admit(self) -> Rung:
+        with self._lock:
+            self._in_flight += 1
+            self._evaluate()
+            return self.ladder[self._index]
+
+    def release(self, latency: float) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._latencies.append(latency)
+            self._evaluate()
+
+    def _recent_latency(self) -> Optional[float]:
+        """90th percentile of the latency window, or None when empty."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+    def _evaluate(self) -> None:
+        if not self.enabled:
+            return
+        now = self._clock()
+        since_change = now - self._last_change
+        latency = self._recent_latency()
+
+        overloaded = self._in_flight >= self.high_depth or (
+            latency is not None and latency >= self.high_latency
+        )
+        relaxed = self._in_flight <= self.low_depth and (
+            latency is None or latency <= self.low_latency
+        )
+
+        if overloaded and self._index < len(self.ladder) - 1:
+            if since_change >= self.down_cooldown:
+                self._move(self._index + 1, now)
+        elif relaxed and self._index > 0:
+            if since_change >= self.up_cooldown:
+                self._move(self._index - 1, now)
+
+    def _move(self, index: int, now: float) -> None:
+        self._index = index
+        self._last_change = now
+        # Latencies observed on the previous rung say nothing about this one.
+        self._latencies.clear()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            latency = self._recent_latency()
+            return {
+                "enabled": self.enabled,
+                "rung": self.ladder[self._index].name,
+                "rung_index": self._index,
+                "ladder": [r.name for r in self.ladder],
+                "in_flight": self._in_flight,
+                "recent_p90_latency_s": round(latency, 3) if latency is not None else None,
+            }
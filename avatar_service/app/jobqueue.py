@@ -0,0 +1,258 @@
+"""
+Durable avatar generation queue in a single SQLite file.
+
+The HTTP app enqueues uploads; worker processes (``python -m app.worker``)
+claim them under a time-limited lease, extend the lease while they work and
+record the result digest and timings. A worker that dies mid-job simply
+stops renewing its lease — once it expires the job is handed to another
+worker, up to ``max_attempts`` claims in total. Nothing is lost across a
+restart of either side because every state change is a committed write.
+
+Any number of processes may share the file. WAL journaling needs shared
+memory, so with WAL every process must be on the same host (a shared docker
+volume is fine); set ``AVATAR_QUEUE_JOURNAL=DELETE`` when workers on other
+hosts share the file over a filesystem with working POSIX locks.
+
+Finished rows are not kept forever: ``purge()`` deletes done and failed jobs
+that finished more than ``retention_seconds`` ago. Workers purge every
+AVATAR_QUEUE_PURGE_INTERVAL seconds; ``python -m app.jobqueue`` purges once,
+e.g. from cron. A purged job answers 404 on GET /jobs/{id}, just like an
+unknown id, so clients should fetch the result well within the retention.
+
+    AVATAR_QUEUE_RETENTION  seconds to keep finished jobs (default 604800
+                            = 7 days, 0 = keep forever)
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DEFAULT_QUEUE_PATH = Path(__file__).resolve().parent.parent / "var" / "jobs.sqlite3"
+DEFAULT_RETENTION_SECONDS = 7 * 86400
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            TEXT PRIMARY KEY,
+    status        TEXT NOT NULL,
+    payload       BLOB,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    created_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    digest        TEXT,
+    engine        TEXT,
+    rung          TEXT,
+    error         TEXT,
+    run_seconds   REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+# Everything except the payload, for status responses
+PUBLIC_COLUMNS = (
+    "id, status, attempts, max_attempts, lease_owner, created_at, started_at, "
+    "finished_at, digest, engine, rung, error, run_seconds"
+)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Job:
+    id: str
+    payload: bytes
+    attempts: int
+    created_at: float
+
+
+class JobQueue:
+    """
+    Thread-safe handle on the queue file; each thread gets its own SQLite
+    connection. Claims run in ``BEGIN IMMEDIATE`` transactions, so two
+    workers can never lease the same job.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        journal_mode: str = "WAL",
+        retention_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.journal_mode = journal_mode
+        self.retention_seconds = retention_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        return cls(
+            os.getenv("AVATAR_QUEUE_PATH", DEFAULT_QUEUE_PATH),
+            lease_seconds=float(os.getenv("AVATAR_QUEUE_LEASE", "60")),
+            max_attempts=int(os.getenv("AVATAR_QUEUE_MAX_ATTEMPTS", "3")),
+            journal_mode=os.getenv("AVATAR_QUEUE_JOURNAL", "WAL"),
+            retention_seconds=float(os.getenv("AVATAR_QUEUE_RETENTION", DEFAULT_RETENTION_SECONDS)) or None,
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly.
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ── Producer side ────────────────────────────────────────────────
+
+    def enqueue(self, payload: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO jobs (id, status, payload, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, PENDING, payload, self.max_attempts, self._clock()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, object]]:
+        row = self._conn().execute(
+            f"SELECT {PUBLIC_COLUMNS} FROM jobs WHERE id = ?", (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        started = job["started_at"]
+        job["queue_seconds"] = round(started - job["created_at"], 3) if started else None
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for status, count in self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        """
+        Delete done and failed jobs that finished more than ``older_than``
+        seconds ago (default: ``retention_seconds``; None keeps everything).
+        Pending and running jobs are never touched. Returns the rows deleted.
+        """
+        if older_than is None:
+            older_than = self.retention_seconds
+        if older_than is None:
+            return 0
+        cur = self._conn().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (DONE, FAILED, self._clock() - older_than),
+        )
+        return cur.rowcount
+
+    # ── Worker side ──────────────────────────────────────────────────
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Lease the oldest pending job, or a running one whose lease has
+        expired. Jobs that already used up their attempts are failed.
+        """
+        conn = self._conn()
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = 'lease expired after final attempt', "
+                "finished_at = ?, payload = NULL, lease_owner = NULL "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, RUNNING, now),
+            )
+            row = conn.execute(
+                "SELECT id, payload, attempts, created_at FROM jobs "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (PENDING, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, started_at = ?, error = NULL WHERE id = ?",
+                (RUNNING, worker_id, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Job(row["id"], row["payload"], row["attempts"] + 1, row["created_at"])
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False means it was lost to another worker."""
+        cur = self._conn().execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (self._clock() + self.lease_seconds, job_id, RUNNING, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, digest: str, engine: str,
+                 rung: str, run_seconds: float) -> bool:
+        """Record the result; ignored (returns False) if the lease was lost."""
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, digest = ?, engine = ?, rung = ?, run_seconds = ?, "
+            "finished_at = ?, payload = NULL, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (DONE, digest, engine, rung, round(run_seconds, 3), self._clock(),
+             job_id, RUNNING, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Give the job back for another attempt, or fail it for good."""
+        now = self._clock()
+        cur = self._conn().execute(
+            "UPDATE jobs SET "
+            "status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+            "finished_at = CASE WHEN attempts >= max_attempts THEN ? END, "
+            "payload = CASE WHEN attempts >= max_attempts THEN NULL ELSE payload END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (FAILED, PENDING, now, error[:500], job_id, RUNNING, worker_id),
+        )
+        return cur.rowcount == 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    queue = JobQueue.from_env()
+    print({"purged": queue.purge(), **queue.stats()})
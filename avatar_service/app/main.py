@@ -6,15 +6,28 @@ cartoon avatar that looks completely different from the original photo.
 Falls back to an enhanced OpenCV cartoon filter when the HF API is unavailable.
 """
 
+import asyncio
 import io
 import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import numpy as np
 import cv2
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
-from PIL import Image, ImageEnhance
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from PIL import Image
 from huggingface_hub import InferenceClient
 
+from .animation import ANIMATED_FORMATS, Animation, animated_format, assemble, dedupe, extract_frames
+from .degrade import DegradationController, Rung
+from .jobqueue import DONE, JobQueue
+from .store import AvatarStore, MEDIA_TYPES, etag_for, etag_matches
+from .topology import choose_layout
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -42,58 +55,227 @@ IMG2IMG_STRENGTH = 0.90
 hf_client = InferenceClient(token=HF_TOKEN)
 
 # ── Service setup ────────────────────────────────────────────────────
-app = FastAPI(title="Avatar Generator Service – HF AI", version="5.0.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    pruner = asyncio.create_task(prune_store_periodically())
+    try:
+        yield
+    finally:
+        pruner.cancel()
+
+
+app = FastAPI(title="Avatar Generator Service – HF AI", version="5.0.0", lifespan=lifespan)
 
 MAX_FILE_SIZE = 5 * 1024 * 1024
 ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+# The raw-body endpoint also accepts untyped bytes; the decoder sniffs the format.
+ALLOWED_RAW_TYPES = ALLOWED_TYPES | {"application/octet-stream"}
 TARGET_SIZE = (512, 512)   # optimal resolution for SD 2.1
+CONTRAST_FACTOR = 1.15
+COLOR_FACTOR = 1.10
+
+# Generated avatars are kept in a content-addressed directory and served
+# from GET /avatars/{digest}; the bytes behind a digest never change. The
+# directory is capped (see app.store) and pruned on this interval.
+avatar_store = AvatarStore.from_env()
+STORE_PRUNE_INTERVAL = float(os.getenv("AVATAR_STORE_PRUNE_INTERVAL", "600"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Queued generations (POST /jobs) survive restarts in this SQLite file and
+# are processed by `python -m app.worker`, scaled separately from HTTP workers.
+job_queue = JobQueue.from_env()
+
+# Under load the service steps down HF 512 → HF 384 → OpenCV → cheap OpenCV.
+degradation = DegradationController.from_env()
+
+# Size OpenCV's internal pool and our generation executor to this worker's
+# share of the CPUs so several workers don't oversubscribe the box.
+layout = choose_layout()
+cv2.setNumThreads(layout.cv_threads)
+generation_executor = ThreadPoolExecutor(
+    max_workers=layout.executor_threads, thread_name_prefix="avatar-gen",
+)
+# Generation slots may outnumber OpenCV slots (HF calls mostly wait on the
+# network); every OpenCV render holds this gate while it runs.
+opencv_gate = threading.BoundedSemaphore(layout.cv_slots)
+# Animated uploads (?animated=1) are always cartoonised with OpenCV, frame
+# by frame at ANIMATION_SIZE, in one chunk per OpenCV slot.
+MAX_ANIMATION_FRAMES = int(os.getenv("AVATAR_MAX_FRAMES", "48"))
+ANIMATION_SIZE = (256, 256)
+ANIMATION_PARALLELISM = layout.cv_slots
+logger.info(
+    "CPU layout: %.2f CPUs (%s), %d workers × %d OpenCV threads, %d OpenCV / %d generation slots",
+    layout.cpus, layout.cpu_source, layout.workers, layout.cv_threads,
+    layout.cv_slots, layout.executor_threads,
+)
+
+
+# ── Upload validation & decoding ─────────────────────────────────────
+
+def validate_content_type(content_type: str, allowed=ALLOWED_TYPES) -> None:
+    if content_type not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type '{content_type}'. Allowed: {', '.join(allowed)}",
+        )
+
+
+def validate_size(size: int) -> None:
+    if size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum: 5 MB.",
+        )
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Empty file uploaded.")
+
+
+def decode_image(data) -> Image.Image:
+    """
+    Decode any bytes-like object (bytes, bytearray, memoryview) to RGB.
+    OpenCV reads straight from a numpy view over the caller's buffer, so no
+    copy of the encoded payload is made; formats it cannot handle go
+    through PIL instead.
+    """
+    arr = cv2.imdecode(
+        np.frombuffer(data, dtype=np.uint8),
+        cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+    )
+    if arr is None:
+        return Image.open(io.BytesIO(data)).convert("RGB")
+    return Image.fromarray(cv2.cvtColor(arr, cv2.COLOR_BGR2RGB))
+
+
+async def read_raw_body(request: Request) -> memoryview:
+    """
+    Read the request body into one pre-sized buffer, rejecting oversized
+    payloads before they are buffered, and return a view over it.
+    """
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        if not declared.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length.")
+        validate_size(int(declared))
+
+    buf = bytearray(int(declared)) if declared else bytearray()
+    size = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        end = size + len(chunk)
+        validate_size(end)
+        if end > len(buf):
+            buf.extend(bytes(end - len(buf)))
+        buf[size:end] = chunk
+        size = end
+    return memoryview(buf)[:size]
 
 
 # ── Image pre-processing ─────────────────────────────────────────────
 
-def preprocess(img: Image.Image) -> Image.Image:
+def preprocess(img: Image.Image, size=TARGET_SIZE) -> Image.Image:
     """
-    Center-crop to a square, resize to 512×512, and lightly enhance
-    contrast & sharpness so SD has a clean input to work from.
+    Center-crop to a square, resize to ``size`` (512×512 by default), and
+    lightly enhance contrast & sharpness so SD has a clean input to work from.
     """
     w, h = img.size
     side = min(w, h)
     left = (w - side) // 2
     top  = (h - side) // 2
     img = img.crop((left, top, left + side, top + side))
-    img = img.resize(TARGET_SIZE, Image.LANCZOS)
+    img = img.resize(size, Image.LANCZOS)
 
     # Mild contrast boost so colour information is clear for SD
-    img = ImageEnhance.Contrast(img).enhance(1.15)
-    img = ImageEnhance.Color(img).enhance(1.10)
-    return img
+    return Image.fromarray(enhance_contrast_colour(np.array(img)))
+
+
+def enhance_contrast_colour(
+    rgb: np.ndarray, contrast: float = CONTRAST_FACTOR, colour: float = COLOR_FACTOR,
+) -> np.ndarray:
+    """
+    Fused, in-place equivalent of ``ImageEnhance.Contrast(contrast)``
+    followed by ``ImageEnhance.Color(colour)`` on a uint8 RGB array.
+
+    Contrast blends every channel with the mean luma — a per-value affine
+    map, so it is a 256-entry lookup table. Colour blends each pixel with
+    its own luma, done as one saturating weighted sum. PIL truncates where
+    OpenCV rounds, so results agree within ±1 per channel.
+    """
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    mean = int(gray.mean() + 0.5)
+    lut = np.arange(256, dtype=np.float32)
+    lut = np.clip(mean + np.float32(contrast) * (lut - mean), 0, 255).astype(np.uint8)
+    cv2.LUT(rgb, lut, dst=rgb)
+
+    cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY, dst=gray)
+    gray_rgb = cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+    cv2.addWeighted(rgb, colour, gray_rgb, 1.0 - colour, 0, dst=rgb)
+    return rgb
 
 
 # ── OpenCV fallback cartoon ──────────────────────────────────────────
 
-def opencv_cartoon_fallback(img_rgb: np.ndarray) -> np.ndarray:
-    """Enhanced OpenCV cartoon used only when the HF API is unreachable."""
-    h, w = img_rgb.shape[:2]
-    big = cv2.resize(img_rgb, (w * 2, h * 2), interpolation=cv2.INTER_LANCZOS4)
-    styled = cv2.stylization(big, sigma_s=60, sigma_r=0.45)
-    colour = styled.copy()
-    for _ in range(4):
-        colour = cv2.bilateralFilter(colour, d=9, sigmaColor=75, sigmaSpace=75)
-    hsv = cv2.cvtColor(colour, cv2.COLOR_RGB2HSV).astype(np.float32)
-    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * 1.5, 0, 255)
-    hsv[:, :, 2] = np.clip(hsv[:, :, 2] * 1.08, 0, 255)
-    colour = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB)
-    gray = cv2.cvtColor(big, cv2.COLOR_RGB2GRAY)
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)
-    gray = cv2.medianBlur(gray, 5)
-    edges = cv2.adaptiveThreshold(
-        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 17, 6,
-    )
+# Colour boost of the cartoon: saturation ×1.5, value ×1.08, as uint8 lookups
+SATURATION_LUT = np.clip(np.arange(256, dtype=np.float32) * np.float32(1.5), 0, 255).astype(np.uint8)
+VALUE_LUT = np.clip(np.arange(256, dtype=np.float32) * np.float32(1.08), 0, 255).astype(np.uint8)
+
+
+def opencv_cartoon_fallback(
+    img_rgb: np.ndarray, upscale: float = 2.0, bilateral_passes: int = 4,
+) -> np.ndarray:
+    """
+    Enhanced OpenCV cartoon used when the HF API is unreachable or the
+    service is shedding load. ``upscale`` sets the internal working
+    resolution relative to the input; values below 1 trade detail for speed.
+    """
+    return opencv_cartoon_batch(img_rgb[np.newaxis], upscale, bilateral_passes)[0]
+
+
+def opencv_cartoon_batch(
+    frames: np.ndarray, upscale: float = 2.0, bilateral_passes: int = 4,
+) -> np.ndarray:
+    """
+    Cartoonise a batch of equally sized RGB frames, shape (N, H, W, 3).
+    Spatial filters run frame by frame; the per-pixel steps (colour boost,
+    greyscale, edge masking) run once over the frames stacked into one
+    tall image, which is exact because they never look at neighbours.
+    """
+    n, h, w = frames.shape[:3]
+    iw, ih = max(1, int(w * upscale)), max(1, int(h * upscale))
+    interp = cv2.INTER_LANCZOS4 if upscale >= 1 else cv2.INTER_AREA
+
+    big = np.empty((n, ih, iw, 3), dtype=np.uint8)
+    colour = np.empty_like(big)
+    for i in range(n):
+        cv2.resize(frames[i], (iw, ih), dst=big[i], interpolation=interp)
+        styled = cv2.stylization(big[i], sigma_s=60, sigma_r=0.45)
+        for _ in range(bilateral_passes):
+            styled = cv2.bilateralFilter(styled, d=9, sigmaColor=75, sigmaSpace=75)
+        colour[i] = styled
+
+    hsv = cv2.cvtColor(colour.reshape(n * ih, iw, 3), cv2.COLOR_RGB2HSV)
+    hsv[:, :, 1] = SATURATION_LUT[hsv[:, :, 1]]
+    hsv[:, :, 2] = VALUE_LUT[hsv[:, :, 2]]
+    colour = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+    grays = cv2.cvtColor(big.reshape(n * ih, iw, 3), cv2.COLOR_RGB2GRAY).reshape(n, ih, iw)
+    edges = np.empty_like(grays)
     kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
-    edges = cv2.morphologyEx(edges, cv2.MORPH_OPEN, kernel)
-    edges_3ch = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
-    cartoon = cv2.bitwise_and(colour, edges_3ch)
-    return cv2.resize(cartoon, (w, h), interpolation=cv2.INTER_AREA)
+    for i in range(n):
+        gray = cv2.GaussianBlur(grays[i], (5, 5), 0)
+        gray = cv2.medianBlur(gray, 5)
+        mask = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 17, 6,
+        )
+        edges[i] = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    edges_3ch = cv2.cvtColor(edges.reshape(n * ih, iw), cv2.COLOR_GRAY2RGB)
+    cartoon = cv2.bitwise_and(colour, edges_3ch).reshape(n, ih, iw, 3)
+
+    out = np.empty((n, h, w, 3), dtype=np.uint8)
+    for i in range(n):
+        cv2.resize(cartoon[i], (w, h), dst=out[i], interpolation=cv2.INTER_AREA)
+    return out
 
 
 # ── HF img2img generation ────────────────────────────────────────────
@@ -115,6 +297,84 @@ def generate_via_huggingface(source: Image.Image) -> Image.Image:
     return result
 
 
+def render_avatar(contents, rung: Rung):
+    """
+    Decode, pre-process and generate an avatar at the given ladder rung.
+    Blocking — run it off the event loop. Returns (PNG bytes, engine).
+    """
+    source = decode_image(contents)
+    source = preprocess(source, rung.size)
+
+    result = None
+    if rung.engine == "huggingface":
+        # ── Primary: Hugging Face AI generation ──────────────────────
+        try:
+            result = generate_via_huggingface(source)
+            engine_used = "huggingface-sd-img2img"
+        except Exception as hf_err:
+            logger.warning("HuggingFace API failed (%s) – falling back to OpenCV.", hf_err)
+
+    if result is None:
+        with opencv_gate:
+            arr = opencv_cartoon_fallback(
+                np.array(source), upscale=rung.upscale, bilateral_passes=rung.bilateral_passes,
+            )
+        result = Image.fromarray(arr)
+        engine_used = "opencv-cartoon-fallback"
+
+    output = io.BytesIO()
+    result.save(output, format="PNG", optimize=True)
+    return output.getvalue(), engine_used
+
+
+def render_and_store(contents, rung: Rung):
+    """``render_avatar`` plus persisting the PNG; returns (PNG bytes, engine, digest)."""
+    png_bytes, engine_used = render_avatar(contents, rung)
+    return png_bytes, engine_used, avatar_store.put(png_bytes)
+
+
+# ── Store maintenance ────────────────────────────────────────────────
+
+async def prune_store_periodically():
+    """Apply the store's size cap / age limit every STORE_PRUNE_INTERVAL seconds."""
+    if STORE_PRUNE_INTERVAL <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, avatar_store.prune)
+        except Exception:
+            logger.exception("Pruning the avatar store failed")
+        await asyncio.sleep(STORE_PRUNE_INTERVAL)
+
+
+# ── Animated avatars ─────────────────────────────────────────────────
+
+def prepare_animation(contents):
+    """Decode, cap, pre-process and de-duplicate the frames of an animation."""
+    animation = extract_frames(contents, MAX_ANIMATION_FRAMES)
+    frames = [np.array(preprocess(frame, ANIMATION_SIZE)) for frame in animation.frames]
+    unique, mapping = dedupe(frames)
+    return animation, unique, mapping
+
+
+def cartoonise_frames(frames, rung: Rung):
+    """Run one chunk of frames through the batched cartoon; returns (frames, seconds)."""
+    batch = np.stack(frames)
+    with opencv_gate:
+        started = time.perf_counter()
+        rendered = opencv_cartoon_batch(
+            batch, upscale=rung.upscale, bilateral_passes=rung.bilateral_passes,
+        )
+        return rendered, time.perf_counter() - started
+
+
+def store_animation(animation: Animation, rendered, mapping):
+    """Re-expand duplicates, encode in the source format and persist."""
+    data = assemble([rendered[i] for i in mapping], animation.durations, animation.loop, animation.format)
+    return data, avatar_store.put(data, ANIMATED_FORMATS[animation.format])
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────
 
 @app.get("/health")
@@ -124,58 +384,38 @@ async def health_check():
         "engine": "huggingface-sd-img2img",
         "model": HF_MODEL,
         "strength": IMG2IMG_STRENGTH,
+        "degradation": degradation.snapshot(),
+        "layout": layout.as_dict(),
+        "queue": await asyncio.get_running_loop().run_in_executor(None, job_queue.stats),
     }
 
 
-@app.post("/generate-avatar")
-async def generate_avatar(file: UploadFile = File(...)):
-    """
-    Generate an AI cartoon avatar from an uploaded photo.
-    Accepts: JPG, PNG, WebP, GIF (max 5 MB)
-    Returns: PNG image (AI-illustrated cartoon, looks different from original)
-    """
-    if file.content_type not in ALLOWED_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type '{file.content_type}'. Allowed: {', '.join(ALLOWED_TYPES)}",
-        )
-
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum: 5 MB.",
-        )
-    if len(contents) == 0:
-        raise HTTPException(status_code=400, detail="Empty file uploaded.")
-
+async def respond_with_avatar(contents) -> Response:
+    """Run the generation pipeline shared by both upload endpoints."""
     try:
-        source = Image.open(io.BytesIO(contents)).convert("RGB")
-        source = preprocess(source)
-
-        # ── Primary: Hugging Face AI generation ──────────────────────
+        rung = degradation.admit()
+        started = time.perf_counter()
         try:
-            result = generate_via_huggingface(source)
-            engine_used = "huggingface-sd-img2img"
-        except Exception as hf_err:
-            logger.warning("HuggingFace API failed (%s) – falling back to OpenCV.", hf_err)
-            arr = opencv_cartoon_fallback(np.array(source))
-            result = Image.fromarray(arr)
-            engine_used = "opencv-cartoon-fallback"
-
-        # ── Encode and return ─────────────────────────────────────────
-        output = io.BytesIO()
-        result.save(output, format="PNG", optimize=True)
-        output.seek(0)
-
-        logger.info("Avatar generated successfully via %s", engine_used)
-
-        return StreamingResponse(
-            output,
+            # The store write is blocking file I/O too, so it runs in the
+            # executor with the render rather than on the event loop.
+            png_bytes, engine_used, digest = await asyncio.get_running_loop().run_in_executor(
+                generation_executor, render_and_store, contents, rung,
+            )
+        finally:
+            degradation.release(time.perf_counter() - started)
+
+        logger.info("Avatar generated successfully via %s at %s (%s)", engine_used, rung.name, digest)
+
+        return Response(
+            content=png_bytes,
             media_type="image/png",
             headers={
                 "Content-Disposition": "inline; filename=avatar.png",
                 "X-Avatar-Engine": engine_used,
+                "X-Avatar-Rung": rung.name,
+                "X-Avatar-Digest": digest,
+                "Location": f"/avatars/{digest}",
+                "ETag": etag_for(digest),
             },
         )
 
@@ -184,3 +424,168 @@ async def generate_avatar(file: UploadFile = File(...)):
     except Exception:
         logger.exception("Avatar generation failed")
         raise HTTPException(status_code=500, detail="Avatar generation failed: internal error")
+
+
+async def respond_with_animated_avatar(contents, fmt: str) -> Response:
+    """
+    Cartoonise every (distinct) frame of an animated upload in parallel
+    chunks and return an animation in the source format with the source
+    timing. Per-frame cost is reported in X-Avatar-Frame-Ms.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        rung = degradation.admit()
+        started = time.perf_counter()
+        try:
+            animation, unique, mapping = await loop.run_in_executor(
+                generation_executor, prepare_animation, contents,
+            )
+            chunk = math.ceil(len(unique) / ANIMATION_PARALLELISM)
+            results = await asyncio.gather(*(
+                loop.run_in_executor(generation_executor, cartoonise_frames, unique[i:i + chunk], rung)
+                for i in range(0, len(unique), chunk)
+            ))
+            rendered = [frame for frames, _ in results for frame in frames]
+            frame_seconds = sum(seconds for _, seconds in results)
+            data, digest = await loop.run_in_executor(
+                generation_executor, store_animation, animation, rendered, mapping,
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            degradation.release(elapsed)
+
+        ext = ANIMATED_FORMATS[fmt]
+        logger.info(
+            "Animated avatar: %d/%d frames (%d distinct) at %s in %.2fs (%s)",
+            len(mapping), animation.source_frames, len(unique), rung.name, elapsed, digest,
+        )
+        return Response(
+            content=data,
+            media_type=MEDIA_TYPES[ext],
+            headers={
+                "Content-Disposition": f"inline; filename=avatar.{ext}",
+                "X-Avatar-Engine": "opencv-cartoon-fallback",
+                "X-Avatar-Rung": rung.name,
+                "X-Avatar-Digest": digest,
+                "X-Avatar-Frames": str(len(mapping)),
+                "X-Avatar-Frames-Source": str(animation.source_frames),
+                "X-Avatar-Frames-Unique": str(len(unique)),
+                "X-Avatar-Frame-Ms": f"{frame_seconds / len(unique) * 1000:.1f}",
+                "X-Avatar-Render-Ms": f"{elapsed * 1000:.0f}",
+                "Location": f"/avatars/{digest}",
+                "ETag": etag_for(digest),
+            },
+        )
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Animated avatar generation failed")
+        raise HTTPException(status_code=500, detail="Avatar generation failed: internal error")
+
+
+async def respond_with_upload(contents, animated: bool) -> Response:
+    """Dispatch to the animated pipeline for multi-frame GIF/WebP when asked to."""
+    if animated:
+        fmt = await asyncio.get_running_loop().run_in_executor(
+            generation_executor, animated_format, contents,
+        )
+        if fmt is not None:
+            return await respond_with_animated_avatar(contents, fmt)
+    return await respond_with_avatar(contents)
+
+
+@app.post("/generate-avatar")
+async def generate_avatar(file: UploadFile = File(...), animated: bool = False):
+    """
+    Generate an AI cartoon avatar from an uploaded photo.
+    Accepts: JPG, PNG, WebP, GIF (max 5 MB)
+    Returns: PNG image (AI-illustrated cartoon, looks different from original)
+
+    With ``?animated=1`` a multi-frame GIF/WebP comes back as an animated
+    cartoon in the same format instead of a PNG of its first frame.
+    """
+    validate_content_type(file.content_type)
+
+    contents = await file.read()
+    validate_size(len(contents))
+    return await respond_with_upload(memoryview(contents), animated)
+
+
+@app.post("/generate-avatar/raw")
+async def generate_avatar_raw(request: Request, animated: bool = False):
+    """
+    Same as /generate-avatar, but the photo is the request body itself
+    (Content-Type: image/* or application/octet-stream). Skips multipart
+    parsing and temp-file spooling; the body is decoded in place.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    validate_content_type(content_type, ALLOWED_RAW_TYPES)
+
+    body = await read_raw_body(request)
+    validate_size(len(body))
+    return await respond_with_upload(body, animated)
+
+
+@app.post("/jobs", status_code=202)
+async def enqueue_avatar_job(file: UploadFile = File(...)):
+    """
+    Queue an avatar generation for the worker pool instead of rendering it
+    in this request. Returns 202 with the job id at once; poll
+    GET /jobs/{id} until it is done and fetch the PNG from its avatar_url.
+    """
+    validate_content_type(file.content_type)
+
+    contents = await file.read()
+    validate_size(len(contents))
+    job_id = await asyncio.get_running_loop().run_in_executor(None, job_queue.enqueue, contents)
+    return JSONResponse(
+        status_code=202,
+        content={"id": job_id, "status": "pending"},
+        headers={"Location": f"/jobs/{job_id}"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_avatar_job(job_id: str):
+    """
+    Status, attempts and timings of a queued job, plus the result once done.
+    Finished jobs are purged after AVATAR_QUEUE_RETENTION (see app.jobqueue)
+    and then answer 404 like an unknown id.
+    """
+    job = await asyncio.get_running_loop().run_in_executor(None, job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job["status"] == DONE:
+        job["avatar_url"] = f"/avatars/{job['digest']}"
+    return job
+
+
+@app.api_route("/avatars/{digest}", methods=["GET", "HEAD"])
+async def get_avatar(digest: str, request: Request):
+    """
+    Serve a previously generated avatar by its SHA-256 digest.
+    Responses carry a strong ETag and are cacheable forever; a matching
+    If-None-Match yields 304, and Range requests are honoured.
+    """
+    path = avatar_store.get_path(digest)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Avatar not found.")
+
+    etag = etag_for(digest)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse streams straight from disk (and hands the path to the
+    # server via the ``http.response.pathsend`` extension when available,
+    # letting it use sendfile) and handles Range / If-Range itself.
+    ext = path.suffix.lstrip(".")
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[ext],
+        headers=headers,
+        content_disposition_type="inline",
+        filename=f"avatar.{ext}",
+    )
@@ -0,0 +1,197 @@
+"""
+Content-addressed storage for generated avatars.
+
+Every encoded avatar (a PNG, or a GIF / WebP when animated) is written
+once under its SHA-256 digest, so the same bytes always live at the same
+path and can be served as immutable files.
+
+The store is a cache, not an archive: ``prune()`` drops files older than
+``max_age_seconds`` and then the least recently written ones until the
+total is back under ``max_bytes`` (regenerating an avatar refreshes its
+file). The HTTP app prunes every AVATAR_STORE_PRUNE_INTERVAL seconds;
+``python -m app.store`` prunes once, e.g. from cron. A pruned digest
+answers 404 — including one named by an older finished job — and the
+client simply generates the avatar again.
+
+    AVATAR_STORE_MAX_MB        size cap (default 2048, 0 = unbounded)
+    AVATAR_STORE_MAX_AGE_DAYS  age limit (default 0 = none)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / "var" / "avatars"
+
+# Stored extensions and the media type each is served with
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+DEFAULT_MAX_MB = 2048
+# Pruning stops below this fraction of max_bytes, so it does not run again
+# after the very next put.
+PRUNE_LOW_WATER = 0.9
+# Temp files of interrupted writes older than this are removed
+STALE_TMP_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+
+class AvatarStore:
+    """
+    Files are sharded by the first two hex characters of the digest
+    (``ab/abcdef….png``) to keep directory listings small.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+
+    @classmethod
+    def from_env(cls) -> "AvatarStore":
+        max_mb = float(os.getenv("AVATAR_STORE_MAX_MB", DEFAULT_MAX_MB))
+        max_age_days = float(os.getenv("AVATAR_STORE_MAX_AGE_DAYS", "0"))
+        return cls(
+            os.getenv("AVATAR_STORE_DIR", DEFAULT_STORE_DIR),
+            max_bytes=int(max_mb * 1024 * 1024) or None,
+            max_age_seconds=max_age_days * 86400 or None,
+        )
+
+    @staticmethod
+    def digest_of(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def is_valid_digest(digest: str) -> bool:
+        return bool(DIGEST_RE.match(digest))
+
+    def path_for(self, digest: str, ext: str = "png") -> Path:
+        return self.root / digest[:2] / f"{digest}.{ext}"
+
+    def put(self, data: bytes, ext: str = "png") -> str:
+        """Persist ``data`` (idempotently) and return its digest."""
+        digest = self.digest_of(data)
+        target = self.path_for(digest, ext)
+        if target.exists():
+            try:
+                os.utime(target)  # recently produced again: prune it last
+                return digest
+            except FileNotFoundError:
+                pass  # pruned in the meantime; write it again
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory, then rename, so a
+        # concurrent reader never observes a partially written file.
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return digest
+
+    def get_path(self, digest: str) -> Optional[Path]:
+        """Return the stored file for ``digest``, or ``None`` if unknown."""
+        if not self.is_valid_digest(digest):
+            return None
+        for ext in MEDIA_TYPES:
+            path = self.path_for(digest, ext)
+            if path.is_file():
+                return path
+        return None
+
+
+    def prune(self) -> Dict[str, int]:
+        """
+        Apply the age limit and size cap; return counts of what is kept and
+        removed. Safe to run from several processes at once.
+        """
+        now = self._clock()
+        entries = []
+        removed = freed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix != ".tmp":
+                entries.append((stat.st_mtime, stat.st_size, path))
+            elif now - stat.st_mtime > STALE_TMP_SECONDS and self._unlink(path):
+                removed += 1
+                freed += stat.st_size
+
+        entries.sort()  # oldest first
+        total = sum(size for _, size, _ in entries)
+        kept = len(entries)
+        # Once over the cap, go down to the low-water mark
+        limit = None
+        if self.max_bytes is not None and total > self.max_bytes:
+            limit = self.max_bytes * PRUNE_LOW_WATER
+        for mtime, size, path in entries:
+            expired = self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+            if not expired and (limit is None or total <= limit):
+                break
+            if self._unlink(path):
+                removed += 1
+                freed += size
+            total -= size
+            kept -= 1
+
+        if removed:
+            logger.info("Pruned %d avatar files (%.1f MiB); %d kept", removed, freed / 1048576, kept)
+        return {"kept": kept, "kept_bytes": total, "removed": removed, "freed_bytes": freed}
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def etag_for(digest: str) -> str:
+    """Strong validator: the bytes are fully determined by the digest."""
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against ``etag`` (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Weak comparison is what If-None-Match uses.
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(AvatarStore.from_env().prune())
@@ -0,0 +1,155 @@
+"""
+CPU topology detection and process/thread layout.
+
+Several uvicorn workers on one box each running OpenCV with its default
+"use every core" thread pool oversubscribe the CPU badly during fallback
+storms. The layout chosen here keeps
+
+    workers × opencv_threads ≤ available CPUs
+
+and bounds how many generations a worker runs at once, and how many of
+those may be inside OpenCV at the same time. Every value can be overridden
+with AVATAR_WORKERS (or WEB_CONCURRENCY), AVATAR_CV_THREADS, AVATAR_CV_SLOTS
+and AVATAR_EXECUTOR_THREADS.
+
+A service process cannot see how many siblings its launcher started, so it
+relies on AVATAR_WORKERS / WEB_CONCURRENCY; ``python -m app`` and
+``python -m app.worker`` export the count they chose. With neither set
+(e.g. a plain ``uvicorn app.main:app``) the process assumes it runs alone
+and gives OpenCV the whole CPU budget.
+"""
+
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+@dataclass(frozen=True)
+class Layout:
+    cpus: float           # effective CPUs (affinity ∩ cgroup quota)
+    cpu_source: str       # what limited the CPU count
+    workers: int          # uvicorn worker processes
+    cv_threads: int       # cv2.setNumThreads per worker
+    cv_slots: int         # concurrent OpenCV renders per worker
+    executor_threads: int  # concurrent generations per worker
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def _cgroup_quota() -> Optional[float]:
+    """CPU limit imposed by the container's cgroup, or None when unlimited."""
+    try:
+        quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(CGROUP_V1_QUOTA.read_text())
+        period = int(CGROUP_V1_PERIOD.read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> Tuple[float, str]:
+    """Return (cpu count, source) honouring CPU affinity and cgroup quotas."""
+    if hasattr(os, "sched_getaffinity"):
+        count, source = float(len(os.sched_getaffinity(0))), "affinity"
+    else:
+        count, source = float(os.cpu_count() or 1), "cpu_count"
+
+    quota = _cgroup_quota()
+    if quota is not None and quota < count:
+        count, source = quota, "cgroup"
+    return count, source
+
+
+def _env_int(env: Mapping[str, str], name: str) -> Optional[int]:
+    value = env.get(name)
+    if not value:
+        return None
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{name} must be >= 1, got {number}")
+    return number
+
+
+def worker_count_from_env(env: Mapping[str, str] = os.environ) -> Optional[int]:
+    """Worker count announced by a launcher: AVATAR_WORKERS, else WEB_CONCURRENCY."""
+    return _env_int(env, "AVATAR_WORKERS") or _env_int(env, "WEB_CONCURRENCY")
+
+
+def choose_layout(
+    env: Mapping[str, str] = os.environ,
+    cpus: Optional[Tuple[float, str]] = None,
+    *,
+    planning: bool = False,
+) -> Layout:
+    """
+    Launchers (``planning=True``) favour throughput: one worker per CPU with
+    one OpenCV thread each. A service process with no announced worker count
+    assumes it is the only one and uses every CPU for OpenCV. Overriding
+    only one of workers / cv_threads derives the other from the CPU budget.
+    """
+    count, source = cpus if cpus is not None else available_cpus()
+    budget = max(1, math.floor(count))
+
+    workers = worker_count_from_env(env)
+    cv_threads = _env_int(env, "AVATAR_CV_THREADS")
+
+    if workers is None and cv_threads is None:
+        if planning:
+            workers, cv_threads = budget, 1
+        else:
+            workers, cv_threads = 1, budget
+    elif workers is None:
+        workers = max(1, budget // cv_threads) if planning else 1
+    elif cv_threads is None:
+        cv_threads = max(1, budget // workers)
+
+    # OpenCV renders are CPU-bound and each already uses cv_threads threads,
+    # so only as many run at once as fit this worker's share of the CPUs —
+    # normally one. benchmarks/bench_layouts.py sweeps this (--slots).
+    share = max(1, budget // workers)
+    cv_slots = _env_int(env, "AVATAR_CV_SLOTS") or max(1, share // cv_threads)
+
+    # The executor also carries Hugging Face calls, which mostly wait on the
+    # network: one extra slot per OpenCV slot keeps an HF call in flight
+    # while OpenCV is busy. OpenCV itself is gated to cv_slots (see
+    # app.main.opencv_gate), so extra slots never add CPU-bound work.
+    executor_threads = _env_int(env, "AVATAR_EXECUTOR_THREADS") or 2 * cv_slots
+
+    if workers * cv_threads * cv_slots > budget:
+        logger.warning(
+            "Layout oversubscribes CPUs: %d workers × %d OpenCV threads × %d slots > %d CPUs",
+            workers, cv_threads, cv_slots, budget,
+        )
+
+    return Layout(
+        cpus=round(count, 2),
+        cpu_source=source,
+        workers=workers,
+        cv_threads=cv_threads,
+        cv_slots=cv_slots,
+        executor_threads=executor_threads,
+    )
+
+
+def export_worker_count(layout: Layout, env=os.environ) -> None:
+    """Announce the worker count to child processes (see module docstring)."""
+    env["AVATAR_WORKERS"] = str(layout.workers)
+    env["WEB_CONCURRENCY"] = str(layout.workers)
@@ -0,0 +1,148 @@
+"""
+Generation workers for the durable job queue.
+
+    python -m app.worker                  # from avatar_service/
+    python -m app.worker --processes 4
+
+Each process claims jobs from the queue file (``AVATAR_QUEUE_PATH``), renders
+them with the same pipeline and degradation ladder as the HTTP endpoints,
+writes the PNG into the avatar store (``AVATAR_STORE_DIR`` — share it with
+the HTTP app, which serves the results) and records the outcome. Leases are
+renewed while a job runs, so a long Hugging Face call is never handed out
+twice; a killed worker's job is picked up again once its lease expires.
+
+Every AVATAR_QUEUE_PURGE_INTERVAL seconds (default 3600, 0 = never) a
+worker also purges finished jobs past AVATAR_QUEUE_RETENTION from the queue
+(see app.jobqueue).
+
+SIGTERM / Ctrl-C lets every process finish its current job, then exit.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from .jobqueue import Job, JobQueue, default_worker_id
+from .topology import choose_layout
+
+logger = logging.getLogger(__name__)
+
+IDLE_POLL_MIN = 0.05
+IDLE_POLL_MAX = 1.0
+PURGE_INTERVAL = float(os.getenv("AVATAR_QUEUE_PURGE_INTERVAL", "3600"))
+
+
+def process_job(service, queue: JobQueue, job: Job, worker_id: str) -> bool:
+    """Render one claimed job and record the result; return True on success."""
+    rung = service.degradation.admit()
+    started = time.perf_counter()
+
+    finished = threading.Event()
+
+    def keep_lease():
+        while not finished.wait(queue.lease_seconds / 3):
+            if not queue.heartbeat(job.id, worker_id):
+                logger.warning("Lost the lease on job %s", job.id)
+                return
+
+    renewer = threading.Thread(target=keep_lease, name=f"lease-{job.id[:8]}", daemon=True)
+    renewer.start()
+    try:
+        _, engine_used, digest = service.render_and_store(job.payload, rung)
+    except Exception as exc:
+        logger.exception("Job %s failed on attempt %d", job.id, job.attempts)
+        queue.fail(job.id, worker_id, f"{type(exc).__name__}: {exc}")
+        return False
+    finally:
+        finished.set()
+        renewer.join()
+        service.degradation.release(time.perf_counter() - started)
+
+    run_seconds = time.perf_counter() - started
+    if not queue.complete(job.id, worker_id, digest, engine_used, rung.name, run_seconds):
+        # Another worker owns it now; the stored PNG is content-addressed,
+        # so a duplicate result is harmless.
+        logger.warning("Job %s finished after its lease was lost; result not recorded", job.id)
+        return False
+    logger.info("Job %s done via %s at %s in %.2fs (%s)", job.id, engine_used, rung.name, run_seconds, digest)
+    return True
+
+
+def purge_finished_jobs(queue: JobQueue) -> None:
+    """Apply the queue's retention; a failed purge is retried next interval."""
+    try:
+        purged = queue.purge()
+    except Exception:
+        logger.exception("Purging finished jobs failed")
+        return
+    if purged:
+        logger.info("Purged %d finished jobs older than %.0fs", purged, queue.retention_seconds)
+
+
+def run_worker(processes: int, stop) -> None:
+    """Body of one worker process: claim and process jobs until ``stop`` is set."""
+    logging.basicConfig(level=logging.INFO)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    # Size OpenCV for this many generation processes before the service
+    # module applies its layout.
+    os.environ.setdefault("AVATAR_WORKERS", str(processes))
+    from . import main as service
+
+    queue = JobQueue.from_env()
+    worker_id = default_worker_id()
+    logger.info("Worker %s polling %s", worker_id, queue.path)
+
+    idle = IDLE_POLL_MIN
+    next_purge = time.monotonic()
+    while not stop.is_set():
+        if PURGE_INTERVAL > 0 and time.monotonic() >= next_purge:
+            purge_finished_jobs(queue)
+            next_purge = time.monotonic() + PURGE_INTERVAL
+        job = queue.claim(worker_id)
+        if job is None:
+            stop.wait(idle)
+            idle = min(idle * 2, IDLE_POLL_MAX)
+            continue
+        idle = IDLE_POLL_MIN
+        process_job(service, queue, job, worker_id)
+    queue.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avatar generation queue workers")
+    parser.add_argument(
+        "--processes", type=int,
+        default=int(os.getenv("AVATAR_QUEUE_WORKERS", "0")) or choose_layout(planning=True).workers,
+        help="worker processes (default: AVATAR_QUEUE_WORKERS or the CPU layout)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    workers = [
+        ctx.Process(target=run_worker, args=(args.processes, stop), name=f"avatar-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for proc in workers:
+        proc.start()
+    logger.info("Started %d avatar workers", len(workers))
+
+    def shutdown(*_):
+        logger.info("Stopping workers after their current jobs …")
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for proc in workers:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
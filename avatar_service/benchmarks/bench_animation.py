@@ -0,0 +1,144 @@
+"""
+Benchmark the animated avatar pipeline against naive per-frame rendering.
+
+A synthetic "ping-pong" animation (every frame except the two ends appears
+twice, as in most looping GIFs) is cartoonised two ways:
+
+- naive:     every decoded frame through ``opencv_cartoon_fallback``, one
+             after the other
+- pipeline:  ``prepare_animation`` (frame cap + de-duplication) and batched
+             ``opencv_cartoon_batch`` chunks over ANIMATION_PARALLELISM
+             threads, as ``/generate-avatar?animated=1`` does
+
+For each it reports the wall time, the cost per output frame and per
+rendered frame, and checks that the output keeps the frame count and the
+per-frame durations of the source.
+
+Usage (from avatar_service/):
+    python -m benchmarks.bench_animation --frames 24 --format GIF
+    python -m benchmarks.bench_animation --frames 96 --format WEBP --iterations 5
+"""
+
+import argparse
+import io
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.animation import assemble, extract_frames
+from app.main import (
+    ANIMATION_PARALLELISM,
+    ANIMATION_SIZE,
+    MAX_ANIMATION_FRAMES,
+    cartoonise_frames,
+    opencv_cartoon_fallback,
+    prepare_animation,
+    preprocess,
+)
+from app.degrade import DEFAULT_LADDER
+
+FRAME_MS = 40
+
+
+def sample_animation(frames: int, fmt: str) -> bytes:
+    """A blob sweeping across a textured background and back again."""
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 256, (320, 320, 3), dtype=np.uint8), (15, 15), 0)
+    half = frames // 2 + 1
+    positions = list(range(half)) + list(range(half - 2, 0, -1))
+    images = []
+    for pos in positions[:frames]:
+        arr = background.copy()
+        x = 20 + pos * (240 // max(1, half - 1))
+        cv2.circle(arr, (x, 160), 40, (230, 120, 40), -1)
+        images.append(Image.fromarray(arr))
+    output = io.BytesIO()
+    # Lossless WebP so repeated frames decode identically, as they do in GIFs;
+    # lossy WebP re-encodes each repeat slightly differently and defeats the
+    # exact de-duplication.
+    options = {"lossless": True} if fmt == "WEBP" else {}
+    images[0].save(output, format=fmt, save_all=True, append_images=images[1:],
+                   duration=FRAME_MS, loop=0, **options)
+    return output.getvalue()
+
+
+def naive(data: bytes, rung):
+    animation = extract_frames(data, max_frames=10 ** 6)
+    rendered = [
+        opencv_cartoon_fallback(np.array(preprocess(frame, ANIMATION_SIZE)),
+                                upscale=rung.upscale, bilateral_passes=rung.bilateral_passes)
+        for frame in animation.frames
+    ]
+    return assemble(rendered, animation.durations, animation.loop, animation.format), len(rendered)
+
+
+def pipeline(data: bytes, rung, pool: ThreadPoolExecutor):
+    animation, unique, mapping = prepare_animation(data)
+    chunk = math.ceil(len(unique) / ANIMATION_PARALLELISM)
+    results = list(pool.map(lambda i: cartoonise_frames(unique[i:i + chunk], rung),
+                            range(0, len(unique), chunk)))
+    rendered = [frame for frames, _ in results for frame in frames]
+    data = assemble([rendered[i] for i in mapping], animation.durations, animation.loop, animation.format)
+    return data, len(unique)
+
+
+def timed(fn, iterations):
+    fn()  # warm-up
+    times = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def describe(data: bytes):
+    img = Image.open(io.BytesIO(data))
+    durations = []
+    for index in range(img.n_frames):
+        img.seek(index)
+        img.load()
+        durations.append(img.info.get("duration"))
+    return img.n_frames, durations
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="animated avatar pipeline benchmark")
+    parser.add_argument("--frames", type=int, default=24, help="frames in the synthetic animation")
+    parser.add_argument("--format", choices=["GIF", "WEBP"], default="GIF")
+    parser.add_argument("--rung", default="opencv-full", choices=[r.name for r in DEFAULT_LADDER])
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    rung = next(r for r in DEFAULT_LADDER if r.name == args.rung)
+    data = sample_animation(args.frames, args.format)
+    source_frames, source_durations = describe(data)
+    print(f"{args.format} with {source_frames} frames × {FRAME_MS} ms, rung {rung.name}, "
+          f"cap {MAX_ANIMATION_FRAMES}, {ANIMATION_PARALLELISM} parallel chunk(s)")
+
+    naive_s, (naive_out, naive_rendered) = timed(lambda: naive(data, rung), args.iterations)
+    with ThreadPoolExecutor(max_workers=ANIMATION_PARALLELISM) as pool:
+        pipe_s, (pipe_out, pipe_rendered) = timed(lambda: pipeline(data, rung, pool), args.iterations)
+
+    print(f"{'variant':<10} {'wall ms':>9} {'rendered':>9} {'ms/frame':>9} {'ms/render':>10}")
+    for name, seconds, output, rendered in (
+        ("naive", naive_s, naive_out, naive_rendered),
+        ("pipeline", pipe_s, pipe_out, pipe_rendered),
+    ):
+        frames, durations = describe(output)
+        print(f"{name:<10} {seconds * 1000:>9.0f} {rendered:>9} "
+              f"{seconds * 1000 / frames:>9.1f} {seconds * 1000 / rendered:>10.1f}")
+        if source_frames <= MAX_ANIMATION_FRAMES and (frames, durations) != (source_frames, source_durations):
+            print(f"  ⚠ {name}: {frames} frames / {sum(durations)} ms, "
+                  f"source had {source_frames} / {sum(source_durations)} ms")
+
+    print(f"\nspeed-up: ×{naive_s / pipe_s:.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
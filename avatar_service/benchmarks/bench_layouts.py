@@ -0,0 +1,121 @@
+"""
+Sweep worker / OpenCV-thread layouts and record fallback throughput.
+
+Each layout starts ``workers`` processes, sets ``cv2.setNumThreads`` in each
+and runs ``opencv_cartoon_fallback`` on a 512×512 image from ``slots``
+threads per process for a fixed duration — the CPU-bound part of a fallback
+storm with that many OpenCV renders in flight per worker. Throughput and
+per-image latency are printed and optionally written as JSON, so defaults
+for AVATAR_WORKERS / AVATAR_CV_THREADS / AVATAR_CV_SLOTS can be picked from
+data. Slots beyond a worker's CPU share should add latency, not throughput;
+that is why OpenCV renders are gated separately from the (larger) executor.
+
+Usage (from avatar_service/):
+    python -m benchmarks.bench_layouts --duration 20 --output layouts.json
+    python -m benchmarks.bench_layouts --slots 1,2,4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.topology import available_cpus
+
+
+def _worker(cv_threads, slots, duration, start_event, results):
+    import cv2
+    from app.main import opencv_cartoon_fallback
+
+    cv2.setNumThreads(cv_threads)
+    rng = np.random.default_rng(0)
+    img = cv2.GaussianBlur(rng.integers(0, 256, (512, 512, 3), dtype=np.uint8), (9, 9), 0)
+    opencv_cartoon_fallback(img)  # warm-up outside the timed window
+
+    start_event.wait()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def loop():
+        latencies = []
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            opencv_cartoon_fallback(img)
+            latencies.append(time.perf_counter() - t0)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=slots) as pool:
+        futures = [pool.submit(loop) for _ in range(slots)]
+        latencies = [lat for f in futures for lat in f.result()]
+    # Renders started before the deadline finish after it; count their time
+    results.put((latencies, time.perf_counter() - started))
+
+
+def run_layout(workers, cv_threads, slots, duration):
+    ctx = mp.get_context("spawn")
+    start_event = ctx.Event()
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(cv_threads, slots, duration, start_event, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    time.sleep(3)  # let every worker import and warm up
+    start_event.set()
+    outcomes = [results.get() for _ in procs]
+    latencies = [lat for lats, _ in outcomes for lat in lats]
+    elapsed = max(seconds for _, seconds in outcomes)
+    for p in procs:
+        p.join()
+    return {
+        "workers": workers,
+        "cv_threads": cv_threads,
+        "slots": slots,
+        "images": len(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 3),
+        "latency_p50_s": round(statistics.median(latencies), 3),
+        "latency_max_s": round(max(latencies), 3),
+    }
+
+
+def candidate_layouts(cpus, slot_counts):
+    counts = sorted({1, 2, 4, cpus // 2, cpus, cpus * 2} - {0})
+    return [(w, t, n) for w in counts for t in counts for n in slot_counts if w * t <= cpus * 2]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="worker × OpenCV thread × slot layout sweep")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per layout")
+    parser.add_argument("--slots", default="1,2",
+                        help="comma separated concurrent OpenCV renders per worker to try")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    count, source = available_cpus()
+    cpus = max(1, int(count))
+    slot_counts = sorted({int(n) for n in args.slots.split(",")})
+    print(f"{count} CPUs available ({source})")
+    print(f"{'workers':>7} {'cv_thr':>6} {'slots':>5} {'img/s':>8} {'p50 s':>7} {'max s':>7}")
+
+    rows = []
+    for workers, cv_threads, slots in candidate_layouts(cpus, slot_counts):
+        row = run_layout(workers, cv_threads, slots, args.duration)
+        rows.append(row)
+        print(f"{workers:>7} {cv_threads:>6} {slots:>5} {row['throughput_per_s']:>8} "
+              f"{row['latency_p50_s']:>7} {row['latency_max_s']:>7}")
+
+    best = max(rows, key=lambda r: r["throughput_per_s"])
+    print(f"\nbest throughput: {best['workers']} workers × {best['cv_threads']} OpenCV threads "
+          f"× {best['slots']} slots")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"cpus": count, "cpu_source": source, "layouts": rows}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
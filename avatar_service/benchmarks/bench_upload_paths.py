@@ -0,0 +1,121 @@
+"""
+Compare per-request CPU time and Python allocations of the multipart
+(/generate-avatar) and raw-body (/generate-avatar/raw) upload paths.
+
+Requests are fed to the ASGI app directly (no sockets) with the body split
+into 64 KiB chunks like a real server would deliver it. Generation itself
+is stubbed out: the first pass measures upload handling alone, the
+second adds decoding, which is where the two paths differ.
+
+Usage (from avatar_service/):
+    python -m benchmarks.bench_upload_paths --iterations 200 --size 1600
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from app import main
+
+CHUNK = 64 * 1024
+BOUNDARY = "----avatar-bench"
+
+
+def sample_jpeg(side: int) -> bytes:
+    rng = np.random.default_rng(0)
+    arr = rng.integers(0, 256, size=(side, side, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def multipart_body(photo: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + photo + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def call_app(path: str, content_type: str, body: bytes, chunks) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    messages = [
+        {"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+        for i, c in enumerate(chunks)
+    ]
+    status = {}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await main.app(scope, receive, send)
+    return status["code"]
+
+
+def upload_only(contents, rung):
+    return b"\x89PNG", "bench"
+
+
+def decode_only(contents, rung):
+    main.decode_image(contents)
+    return b"\x89PNG", "bench"
+
+
+def measure(label, path, content_type, body, iterations):
+    loop = asyncio.new_event_loop()
+    chunks = [body[i:i + CHUNK] for i in range(0, len(body), CHUNK)] or [b""]
+    cpu, peaks = [], []
+    for _ in range(3):  # warm-up
+        loop.run_until_complete(call_app(path, content_type, body, chunks))
+    for _ in range(iterations):
+        tracemalloc.start()
+        t0 = time.process_time()
+        code = loop.run_until_complete(call_app(path, content_type, body, chunks))
+        cpu.append(time.process_time() - t0)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert code == 200, code
+    loop.close()
+    print(f"{label:<10} cpu median={statistics.median(cpu) * 1e3:7.2f} ms  "
+          f"p95={sorted(cpu)[int(0.95 * len(cpu))] * 1e3:7.2f} ms  "
+          f"py-alloc peak median={statistics.median(peaks) / 1024:8.1f} KiB")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="multipart vs raw upload cost")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--size", type=int, default=1600, help="photo side in pixels")
+    args = parser.parse_args()
+
+    main.avatar_store.put = lambda data: "0" * 64
+
+    photo = sample_jpeg(args.size)
+    print(f"payload: {len(photo) / 1024:.0f} KiB JPEG, {args.iterations} iterations")
+    for stage, render in (("upload", upload_only), ("upload+decode", decode_only)):
+        main.render_avatar = render
+        print(f"\n── {stage} ──")
+        measure("multipart", "/generate-avatar",
+                f"multipart/form-data; boundary={BOUNDARY}", multipart_body(photo), args.iterations)
+        measure("raw", "/generate-avatar/raw", "image/jpeg", photo, args.iterations)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,136 @@
+"""
+Load test for the quality degradation ladder.
+
+Runs the service in-process behind uvicorn with a simulated Hugging Face
+backend (a fixed number of remote slots, service time proportional to the
+pixel count), then drives it with an open-loop stream of uploads at a fixed
+arrival rate. The same workload is run twice — ladder pinned to the top
+rung, then adaptive — and latency percentiles plus the rung mix are printed.
+
+Usage (from avatar_service/):
+    python -m benchmarks.load_ladder --rate 2 --duration 60
+"""
+
+import argparse
+import http.client
+import io
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import uvicorn
+from PIL import Image
+
+from app import main
+from app.degrade import DegradationController
+
+
+def simulated_hf(slots: int, seconds_at_512: float):
+    """Return a stand-in for generate_via_huggingface with limited capacity."""
+    gate = threading.Semaphore(slots)
+
+    def generate(source: Image.Image) -> Image.Image:
+        w, h = source.size
+        with gate:
+            time.sleep(seconds_at_512 * (w * h) / (512 * 512))
+        return source
+
+    return generate
+
+
+def sample_upload() -> bytes:
+    rng = np.random.default_rng(0)
+    arr = rng.integers(0, 256, size=(640, 480, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def multipart(photo: bytes):
+    boundary = "----avatar-load-test"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + photo + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def one_request(port: int, body: bytes, content_type: str):
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    try:
+        conn.request("POST", "/generate-avatar", body=body, headers={"Content-Type": content_type})
+        resp = conn.getresponse()
+        resp.read()
+        rung = resp.getheader("X-Avatar-Rung", "error")
+        status = resp.status
+    finally:
+        conn.close()
+    return time.perf_counter() - started, status, rung
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def run_scenario(label, port, controller, rate, duration, body, content_type):
+    main.degradation = controller
+    interval = 1.0 / rate
+    futures = []
+    with ThreadPoolExecutor(max_workers=int(rate * duration) + 1) as pool:
+        start = time.perf_counter()
+        n = 0
+        while time.perf_counter() - start < duration:
+            futures.append(pool.submit(one_request, port, body, content_type))
+            n += 1
+            time.sleep(max(0.0, start + n * interval - time.perf_counter()))
+        results = [f.result() for f in futures]
+
+    latencies = [r[0] for r in results]
+    rungs = Counter(r[2] for r in results)
+    errors = sum(1 for r in results if r[1] != 200)
+    print(f"\n── {label} ──")
+    print(f"requests={len(results)} errors={errors}")
+    print("p50={:.2f}s p95={:.2f}s p99={:.2f}s max={:.2f}s".format(
+        percentile(latencies, 50), percentile(latencies, 95),
+        percentile(latencies, 99), max(latencies),
+    ))
+    print("rungs:", dict(rungs))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=2.0, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds per scenario")
+    parser.add_argument("--hf-slots", type=int, default=2)
+    parser.add_argument("--hf-seconds", type=float, default=3.0, help="simulated HF time at 512×512")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    main.generate_via_huggingface = simulated_hf(args.hf_slots, args.hf_seconds)
+
+    server = uvicorn.Server(uvicorn.Config(main.app, port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    body, content_type = multipart(sample_upload())
+    try:
+        run_scenario("ladder pinned at hf-512", args.port,
+                     DegradationController(enabled=False),
+                     args.rate, args.duration, body, content_type)
+        run_scenario("adaptive ladder", args.port,
+                     DegradationController.from_env(),
+                     args.rate, args.duration, body, content_type)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main_cli()
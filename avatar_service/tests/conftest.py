@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run from anywhere: make the `app` package importable like `python -m app` does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
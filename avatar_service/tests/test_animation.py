@@ -0,0 +1,70 @@
+"""Frame cap, de-duplication and timing round trip of animated avatars."""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.animation import animated_format, assemble, dedupe, extract_frames
+
+
+def solid(value):
+    return np.full((16, 16, 3), value, dtype=np.uint8)
+
+
+def encode(frames, durations, fmt="GIF", loop=0):
+    output = io.BytesIO()
+    images = [Image.fromarray(frame) for frame in frames]
+    options = {"lossless": True} if fmt == "WEBP" else {}
+    images[0].save(output, format=fmt, save_all=True, append_images=images[1:],
+                   duration=durations, loop=loop, **options)
+    return output.getvalue()
+
+
+def frame_durations(data):
+    img = Image.open(io.BytesIO(data))
+    durations = []
+    for index in range(img.n_frames):
+        img.seek(index)
+        img.load()
+        durations.append(img.info["duration"])
+    return durations
+
+
+def test_animated_format_only_for_multi_frame_uploads():
+    assert animated_format(encode([solid(0), solid(255)], [50, 50])) == "GIF"
+    assert animated_format(encode([solid(0), solid(255)], [50, 50], "WEBP")) == "WEBP"
+    assert animated_format(encode([solid(0)], [50])) is None
+    assert animated_format(b"not an image") is None
+
+
+@pytest.mark.parametrize("fmt", ["GIF", "WEBP"])
+def test_frame_cap_keeps_total_duration(fmt):
+    frames = [solid(v) for v in range(0, 250, 25)]  # 10 distinct frames
+    animation = extract_frames(encode(frames, [10 * (i + 1) for i in range(10)], fmt, loop=3), max_frames=4)
+
+    assert animation.source_frames == 10
+    assert len(animation.frames) == 4          # frames 0, 3, 6, 9
+    assert animation.durations == [10 + 20 + 30, 40 + 50 + 60, 70 + 80 + 90, 100]
+    assert animation.loop == 3
+    assert animation.format == fmt
+
+
+def test_dedupe_maps_repeats_to_first_occurrence():
+    frames = [solid(1), solid(2), solid(1), solid(3), solid(2)]
+    unique, mapping = dedupe(frames)
+    assert len(unique) == 3
+    assert mapping == [0, 1, 0, 2, 1]
+    assert all((unique[m] == f).all() for f, m in zip(frames, mapping))
+
+
+@pytest.mark.parametrize("fmt", ["GIF", "WEBP"])
+def test_assemble_keeps_frames_and_timing(fmt):
+    frames = [solid(0), solid(120), solid(240)]
+    data = assemble(frames, [30, 60, 90], 0, fmt)
+
+    img = Image.open(io.BytesIO(data))
+    assert img.format == fmt
+    assert img.n_frames == 3
+    assert frame_durations(data) == [30, 60, 90]
@@ -0,0 +1,125 @@
+"""Caching headers, conditional and Range requests of GET /avatars/{digest};
+the 404 of a purged job."""
+
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import main
+from app.jobqueue import JobQueue
+from app.store import AvatarStore
+
+
+def png(colour, size=(64, 64)):
+    output = io.BytesIO()
+    Image.new("RGB", size, colour).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("AVATAR_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "avatar_store", AvatarStore.from_env())
+    # No network in tests: the "AI" result is a fixed image
+    monkeypatch.setattr(main, "generate_via_huggingface",
+                        lambda source: Image.new("RGB", source.size, (200, 120, 40)))
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def generated(client):
+    response = client.post("/generate-avatar",
+                           files={"file": ("photo.png", png((10, 20, 30)), "image/png")})
+    assert response.status_code == 200
+    assert response.headers["x-avatar-engine"] == "huggingface-sd-img2img"
+    return response
+
+
+def test_generation_points_at_stored_avatar(client, generated, tmp_path):
+    digest = generated.headers["x-avatar-digest"]
+    assert generated.headers["location"] == f"/avatars/{digest}"
+    assert main.avatar_store.root == tmp_path
+    assert main.avatar_store.get_path(digest).read_bytes() == generated.content
+
+
+def test_serves_bytes_with_strong_etag_and_immutable_caching(client, generated):
+    digest = generated.headers["x-avatar-digest"]
+    response = client.get(f"/avatars/{digest}")
+
+    assert response.status_code == 200
+    assert response.content == generated.content
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{digest}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert "max-age=31536000" in response.headers["cache-control"]
+
+
+@pytest.mark.parametrize("form", ['"{}"', 'W/"{}"', '"other", W/"{}"', "*"])
+def test_if_none_match_gives_304(client, generated, form):
+    digest = generated.headers["x-avatar-digest"]
+    response = client.get(f"/avatars/{digest}", headers={"If-None-Match": form.format(digest)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{digest}"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_other_etag_gets_the_body(client, generated):
+    digest = generated.headers["x-avatar-digest"]
+    response = client.get(f"/avatars/{digest}", headers={"If-None-Match": '"0" , W/"1"'})
+    assert response.status_code == 200
+    assert response.content == generated.content
+
+
+def test_range_gives_206(client, generated):
+    digest = generated.headers["x-avatar-digest"]
+    total = len(generated.content)
+    response = client.get(f"/avatars/{digest}", headers={"Range": "bytes=0-9"})
+
+    assert response.status_code == 206
+    assert response.content == generated.content[:10]
+    assert response.headers["content-range"] == f"bytes 0-9/{total}"
+    assert response.headers["etag"] == f'"{digest}"'
+
+    tail = client.get(f"/avatars/{digest}", headers={"Range": "bytes=-5"})
+    assert tail.status_code == 206
+    assert tail.content == generated.content[-5:]
+    assert tail.headers["content-range"] == f"bytes {total - 5}-{total - 1}/{total}"
+
+
+def test_head_has_headers_without_body(client, generated):
+    digest = generated.headers["x-avatar-digest"]
+    response = client.head(f"/avatars/{digest}")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{digest}"'
+    assert response.headers["content-length"] == str(len(generated.content))
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_unknown_digest_is_404(client):
+    assert client.get(f"/avatars/{'0' * 64}").status_code == 404
+    assert client.head(f"/avatars/{'0' * 64}").status_code == 404
+
+
+@pytest.mark.parametrize("digest", ["abc", "z" * 64, "A" * 64, "0" * 65, "..%2F..%2Fetc%2Fpasswd"])
+def test_malformed_digest_is_404(client, generated, digest):
+    assert client.get(f"/avatars/{digest}").status_code == 404
+
+
+def test_purged_job_is_404(client, tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(main, "job_queue", queue)
+    job_id = client.post("/jobs", files={"file": ("photo.png", png((1, 2, 3)), "image/png")}).json()["id"]
+    job = queue.claim("w1")
+    queue.complete(job.id, "w1", "d" * 64, "opencv", "full", 1.0)
+    assert client.get(f"/jobs/{job_id}").json()["avatar_url"] == f"/avatars/{'d' * 64}"
+
+    assert queue.purge(older_than=-1) == 1
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    queue.close()
@@ -0,0 +1,124 @@
+"""Degradation ladder: hysteresis, cooldowns, single steps and window reset."""
+
+import pytest
+
+from app.degrade import DEFAULT_LADDER, DegradationController
+
+
+@pytest.fixture
+def ladder(clock):
+    # Library defaults: depth 4 / 1, p90 latency 20 s / 8 s, cooldowns 2 s down / 15 s up
+    return DegradationController(clock=clock)
+
+
+def rung(ctrl):
+    return ctrl.snapshot()["rung_index"]
+
+
+def admit(ctrl, n):
+    for _ in range(n):
+        ctrl.admit()
+
+
+def release(ctrl, n, latency):
+    for _ in range(n):
+        ctrl.release(latency)
+
+
+def step_down_by_depth(ctrl, clock):
+    """Overload by queue depth and wait out the cooldown; leaves 4 in flight."""
+    admit(ctrl, 3)
+    clock.advance(2.0)
+    ctrl.admit()
+
+
+def test_starts_on_top_rung(ladder):
+    assert ladder.admit() == DEFAULT_LADDER[0]
+    assert rung(ladder) == 0
+
+
+def test_depth_overload_steps_down_only_after_down_cooldown(ladder, clock):
+    admit(ladder, 4)
+    assert rung(ladder) == 0           # overloaded, but < 2 s since start
+    clock.advance(1.9)
+    ladder.admit()
+    assert rung(ladder) == 0
+    clock.advance(0.1)
+    ladder.admit()
+    assert rung(ladder) == 1
+
+
+def test_steps_one_rung_at_a_time(ladder, clock):
+    step_down_by_depth(ladder, clock)
+    admit(ladder, 20)                  # far past the threshold
+    assert rung(ladder) == 1
+
+    clock.advance(2.0)
+    assert ladder.admit() == DEFAULT_LADDER[2]
+    clock.advance(2.0)
+    assert ladder.admit() == DEFAULT_LADDER[3]
+    clock.advance(2.0)
+    ladder.admit()
+    assert rung(ladder) == 3           # bottom rung is the floor
+
+
+def test_steps_up_only_after_up_cooldown(ladder, clock):
+    step_down_by_depth(ladder, clock)
+    release(ladder, 4, 1.0)            # drained and fast: relaxed
+    clock.advance(14.9)
+    ladder.admit(); ladder.release(1.0)
+    assert rung(ladder) == 1
+    clock.advance(0.1)
+    ladder.admit(); ladder.release(1.0)
+    assert rung(ladder) == 0
+
+
+def test_no_movement_between_thresholds(ladder, clock):
+    step_down_by_depth(ladder, clock)
+    release(ladder, 2, 12.0)           # 2 in flight, p90 12 s: neither band
+    for _ in range(10):
+        clock.advance(20.0)
+        ladder.admit()
+        ladder.release(12.0)
+    assert rung(ladder) == 1
+
+
+def test_depth_hysteresis_band(ladder, clock):
+    step_down_by_depth(ladder, clock)
+    ladder.release(1.0)                # 3 in flight: below high, above low
+    clock.advance(30.0)
+    ladder.release(1.0)                # 2 in flight
+    assert rung(ladder) == 1
+    ladder.release(1.0)                # 1 in flight: at low threshold
+    assert rung(ladder) == 0
+
+
+def test_latency_overload_steps_down(ladder, clock):
+    clock.advance(2.0)
+    ladder.admit()
+    ladder.release(25.0)
+    assert rung(ladder) == 1
+
+
+def test_window_is_cleared_after_a_move(ladder, clock):
+    clock.advance(2.0)
+    ladder.admit()
+    ladder.release(25.0)
+    assert rung(ladder) == 1
+    assert ladder.snapshot()["recent_p90_latency_s"] is None
+
+    # The 25 s sample belonged to the previous rung; a fast request on this
+    # rung must not be judged by it.
+    clock.advance(2.0)
+    ladder.admit()
+    ladder.release(3.0)
+    assert rung(ladder) == 1
+    assert ladder.snapshot()["recent_p90_latency_s"] == 3.0
+
+
+def test_disabled_controller_never_moves(clock):
+    ctrl = DegradationController(enabled=False, clock=clock)
+    admit(ctrl, 10)
+    clock.advance(60.0)
+    ctrl.release(100.0)
+    assert rung(ctrl) == 0
@@ -0,0 +1,194 @@
+"""Lease, retry and failure paths of the durable job queue."""
+
+import pytest
+
+from app.jobqueue import DONE, FAILED, PENDING, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    q = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=10.0, max_attempts=2, clock=clock)
+    yield q
+    q.close()
+
+
+def test_claim_returns_oldest_pending_job_once(queue, clock):
+    first = queue.enqueue(b"one")
+    clock.advance(1)
+    queue.enqueue(b"two")
+
+    job = queue.claim("w1")
+    assert job.id == first
+    assert job.payload == b"one"
+    assert job.attempts == 1
+    assert queue.get(first)["status"] == RUNNING
+    assert queue.get(first)["lease_owner"] == "w1"
+
+    assert queue.claim("w2").payload == b"two"
+    assert queue.claim("w3") is None
+
+
+def test_running_job_is_not_reclaimed_before_lease_expiry(queue, clock):
+    job_id = queue.enqueue(b"x")
+    queue.claim("w1")
+    clock.advance(9.9)
+    assert queue.claim("w2") is None
+
+    clock.advance(0.2)
+    job = queue.claim("w2")
+    assert job.id == job_id
+    assert job.attempts == 2
+    assert queue.get(job_id)["lease_owner"] == "w2"
+
+
+def test_heartbeat_extends_lease(queue, clock):
+    queue.enqueue(b"x")
+    job = queue.claim("w1")
+    clock.advance(8)
+    assert queue.heartbeat(job.id, "w1")
+    clock.advance(8)
+    assert queue.claim("w2") is None
+    assert not queue.heartbeat(job.id, "w2")
+
+
+def test_expired_lease_on_final_attempt_fails_job(queue, clock):
+    job_id = queue.enqueue(b"x")
+    queue.claim("w1")
+    clock.advance(11)
+    queue.claim("w2")
+    clock.advance(11)
+
+    assert queue.claim("w3") is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 2
+    assert "lease expired" in job["error"]
+
+
+def test_complete_records_result_and_timings(queue, clock):
+    job_id = queue.enqueue(b"x")
+    clock.advance(3)
+    job = queue.claim("w1")
+    clock.advance(2)
+    assert queue.complete(job.id, "w1", "ab" * 32, "opencv-cartoon-fallback", "opencv-full", 2.0)
+
+    result = queue.get(job_id)
+    assert result["status"] == DONE
+    assert result["digest"] == "ab" * 32
+    assert result["rung"] == "opencv-full"
+    assert result["queue_seconds"] == 3.0
+    assert result["run_seconds"] == 2.0
+    assert result["finished_at"] == clock.now
+    assert queue.stats() == {PENDING: 0, RUNNING: 0, DONE: 1, FAILED: 0}
+
+
+def test_complete_after_lost_lease_is_ignored(queue, clock):
+    job_id = queue.enqueue(b"x")
+    queue.claim("w1")
+    clock.advance(11)
+    queue.claim("w2")
+
+    assert not queue.complete(job_id, "w1", "cd" * 32, "e", "r", 1.0)
+    assert queue.get(job_id)["status"] == RUNNING
+    assert queue.complete(job_id, "w2", "ab" * 32, "e", "r", 1.0)
+    assert queue.get(job_id)["digest"] == "ab" * 32
+
+
+def test_fail_retries_then_fails_for_good(queue):
+    job_id = queue.enqueue(b"x")
+
+    job = queue.claim("w1")
+    assert queue.fail(job.id, "w1", "boom")
+    assert queue.get(job_id)["status"] == PENDING
+    assert queue.get(job_id)["error"] == "boom"
+
+    job = queue.claim("w2")
+    assert job.payload == b"x"
+    assert job.attempts == 2
+    assert queue.fail(job.id, "w2", "boom again")
+
+    result = queue.get(job_id)
+    assert result["status"] == FAILED
+    assert result["error"] == "boom again"
+    assert queue.claim("w3") is None
+
+
+def test_fail_by_non_owner_is_ignored(queue):
+    job_id = queue.enqueue(b"x")
+    queue.claim("w1")
+    assert not queue.fail(job_id, "w2", "not mine")
+    assert queue.get(job_id)["status"] == RUNNING
+
+
+def test_jobs_survive_reopening_the_file(tmp_path, clock):
+    path = tmp_path / "jobs.sqlite3"
+    first = JobQueue(path, clock=clock)
+    job_id = first.enqueue(b"persisted")
+    first.close()
+
+    second = JobQueue(path, clock=clock)
+    assert second.claim("w1").payload == b"persisted"
+    assert second.get(job_id)["status"] == RUNNING
+    second.close()
+
+
+def finish(queue, clock, payload, ok=True):
+    job_id = queue.enqueue(payload)
+    job = queue.claim("w1")
+    if ok:
+        queue.complete(job.id, "w1", "d" * 64, "opencv", "full", 1.0)
+    else:
+        queue.fail(job.id, "w1", "boom")
+        queue.claim("w1")
+        queue.fail(job.id, "w1", "boom")
+    return job_id
+
+
+def test_purge_drops_only_old_finished_jobs(queue, clock):
+    done = finish(queue, clock, b"done")
+    failed = finish(queue, clock, b"failed", ok=False)
+    assert queue.get(failed)["status"] == FAILED
+    clock.advance(100)
+    recent = finish(queue, clock, b"recent")
+    running = queue.enqueue(b"running")
+    queue.claim("w2")
+    pending = queue.enqueue(b"pending")
+    clock.advance(1000)  # the running lease is long expired, but it is not finished
+
+    assert queue.purge(older_than=1050) == 2
+    assert queue.get(done) is None
+    assert queue.get(failed) is None
+    assert queue.get(recent)["status"] == DONE
+    assert queue.get(pending)["status"] == PENDING
+    assert queue.get(running)["status"] == RUNNING
+    assert queue.purge(older_than=1050) == 0
+
+
+def test_purge_defaults_to_retention(tmp_path, clock):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", retention_seconds=60, clock=clock)
+    job_id = finish(queue, clock, b"x")
+    clock.advance(59)
+    assert queue.purge() == 0
+    clock.advance(2)
+    assert queue.purge() == 1
+    assert queue.get(job_id) is None
+    queue.close()
+
+
+def test_without_retention_purge_keeps_everything(queue, clock):
+    job_id = finish(queue, clock, b"x")
+    clock.advance(10 ** 9)
+    assert queue.purge() == 0
+    assert queue.get(job_id)["status"] == DONE
+
+
+@pytest.mark.parametrize("value, expected", [(None, 7 * 86400), ("3600", 3600), ("0", None)])
+def test_retention_from_env(tmp_path, monkeypatch, value, expected):
+    monkeypatch.setenv("AVATAR_QUEUE_PATH", str(tmp_path / "jobs.sqlite3"))
+    if value is None:
+        monkeypatch.delenv("AVATAR_QUEUE_RETENTION", raising=False)
+    else:
+        monkeypatch.setenv("AVATAR_QUEUE_RETENTION", value)
+    queue = JobQueue.from_env()
+    assert queue.retention_seconds == expected
+    queue.close()
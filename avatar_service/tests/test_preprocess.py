@@ -0,0 +1,53 @@
+"""The fused contrast/colour boost matches PIL's ImageEnhance chain."""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageEnhance
+
+from app.main import COLOR_FACTOR, CONTRAST_FACTOR, enhance_contrast_colour
+
+
+def reference(rgb):
+    img = ImageEnhance.Contrast(Image.fromarray(rgb)).enhance(CONTRAST_FACTOR)
+    return np.asarray(ImageEnhance.Color(img).enhance(COLOR_FACTOR))
+
+
+def random_image(seed, size=(96, 128)):
+    return np.random.default_rng(seed).integers(0, 256, (*size, 3), dtype=np.uint8)
+
+
+def grey_image(size=(64, 64)):
+    levels = np.arange(size[0] * size[1], dtype=np.uint32).reshape(size) % 256
+    return np.repeat(levels[:, :, None], 3, axis=2).astype(np.uint8)
+
+
+def near_white_image(seed, size=(64, 64)):
+    return np.random.default_rng(seed).integers(240, 256, (*size, 3), dtype=np.uint8)
+
+
+def photo_like_image(size=(80, 80)):
+    y, x = np.mgrid[0:size[0], 0:size[1]]
+    return np.stack([x * 3 % 256, y * 2 % 256, (x + y) % 256], axis=2).astype(np.uint8)
+
+
+@pytest.mark.parametrize("rgb", [
+    random_image(0),
+    random_image(1, size=(33, 47)),
+    grey_image(),
+    np.full((32, 32, 3), 128, dtype=np.uint8),
+    near_white_image(2),
+    np.full((32, 32, 3), 255, dtype=np.uint8),
+    photo_like_image(),
+], ids=["random", "random-odd", "grey-ramp", "flat-grey", "near-white", "white", "gradient"])
+def test_within_one_of_image_enhance(rgb):
+    expected = reference(rgb)
+    fused = enhance_contrast_colour(rgb.copy())
+
+    delta = np.abs(fused.astype(np.int16) - expected.astype(np.int16))
+    assert delta.max() <= 1
+
+
+def test_works_in_place():
+    rgb = random_image(3)
+    result = enhance_contrast_colour(rgb)
+    assert result is rgb
@@ -0,0 +1,78 @@
+"""Size cap, age limit and recency of the content-addressed avatar store."""
+
+import os
+
+import pytest
+
+from app.store import STALE_TMP_SECONDS, AvatarStore
+
+NOW = 1_000_000.0
+
+
+def put_at(store, data, mtime, ext="png"):
+    digest = store.put(data, ext)
+    path = store.path_for(digest, ext)
+    os.utime(path, (mtime, mtime))
+    return digest
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AvatarStore(tmp_path, max_bytes=1000, clock=lambda: NOW)
+
+
+def test_under_cap_keeps_everything(store):
+    digests = [put_at(store, bytes([i]) * 200, NOW - 100 + i) for i in range(4)]
+    assert store.prune() == {"kept": 4, "kept_bytes": 800, "removed": 0, "freed_bytes": 0}
+    assert all(store.get_path(d) for d in digests)
+
+
+def test_over_cap_drops_oldest_down_to_low_water(store):
+    digests = [put_at(store, bytes([i]) * 200, NOW - 100 + i) for i in range(6)]  # 1200 bytes
+    result = store.prune()
+
+    # 1200 → 1000 cap → keeps going to the 900 low-water mark: two oldest go
+    assert result["removed"] == 2
+    assert result["kept_bytes"] == 800
+    assert [store.get_path(d) is not None for d in digests] == [False, False, True, True, True, True]
+
+
+def test_put_of_existing_avatar_refreshes_recency(store):
+    old = put_at(store, b"a" * 400, NOW - 500)
+    put_at(store, b"b" * 400, NOW - 400)
+    put_at(store, b"c" * 400, NOW - 300)
+    store.put(b"a" * 400)  # regenerated: now the newest
+
+    store.prune()
+    assert store.get_path(old) is not None
+
+
+def test_age_limit(tmp_path):
+    store = AvatarStore(tmp_path, max_age_seconds=3600, clock=lambda: NOW)
+    stale = put_at(store, b"old", NOW - 7200, "gif")
+    fresh = put_at(store, b"new", NOW - 60)
+
+    assert store.prune()["removed"] == 1
+    assert store.get_path(stale) is None
+    assert store.get_path(fresh) is not None
+
+
+def test_stale_temp_files_are_removed(store):
+    shard = store.root / "ab"
+    shard.mkdir()
+    stale, fresh = shard / "x.tmp", shard / "y.tmp"
+    for path, age in ((stale, STALE_TMP_SECONDS + 1), (fresh, 10)):
+        path.write_bytes(b"partial")
+        os.utime(path, (NOW - age, NOW - age))
+
+    store.prune()
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_from_env_zero_disables_limits(tmp_path, monkeypatch):
+    monkeypatch.setenv("AVATAR_STORE_DIR", str(tmp_path))
+    monkeypatch.setenv("AVATAR_STORE_MAX_MB", "0")
+    store = AvatarStore.from_env()
+    assert store.max_bytes is None
+    assert store.max_age_seconds is None
@@ -0,0 +1,60 @@
+"""Worker / OpenCV thread / slot layouts for launchers and service processes."""
+
+import pytest
+
+from app.topology import choose_layout, export_worker_count
+
+EIGHT = (8.0, "affinity")
+
+
+def test_lone_service_process_uses_whole_budget():
+    layout = choose_layout({}, EIGHT)
+    assert (layout.workers, layout.cv_threads, layout.cv_slots) == (1, 8, 1)
+    assert layout.executor_threads == 2
+
+
+def test_launcher_plans_one_worker_per_cpu():
+    layout = choose_layout({}, EIGHT, planning=True)
+    assert (layout.workers, layout.cv_threads, layout.cv_slots) == (8, 1, 1)
+
+
+@pytest.mark.parametrize("name", ["AVATAR_WORKERS", "WEB_CONCURRENCY"])
+def test_announced_worker_count_splits_budget(name):
+    layout = choose_layout({name: "4"}, EIGHT)
+    assert (layout.workers, layout.cv_threads, layout.cv_slots) == (4, 2, 1)
+
+
+def test_avatar_workers_wins_over_web_concurrency():
+    assert choose_layout({"AVATAR_WORKERS": "2", "WEB_CONCURRENCY": "8"}, EIGHT).workers == 2
+
+
+def test_exported_count_reaches_children():
+    env = {}
+    planned = choose_layout(env, EIGHT, planning=True)
+    export_worker_count(planned, env)
+    child = choose_layout(env, EIGHT)
+    assert child.workers == planned.workers
+    assert planned.workers * child.cv_threads * child.cv_slots <= 8
+
+
+def test_spare_share_becomes_opencv_slots():
+    layout = choose_layout({"AVATAR_WORKERS": "2", "AVATAR_CV_THREADS": "2"}, EIGHT)
+    assert layout.cv_slots == 2
+    assert layout.executor_threads == 4
+
+
+def test_explicit_overrides():
+    env = {"AVATAR_WORKERS": "1", "AVATAR_CV_THREADS": "2", "AVATAR_CV_SLOTS": "3",
+           "AVATAR_EXECUTOR_THREADS": "10"}
+    layout = choose_layout(env, EIGHT)
+    assert (layout.cv_threads, layout.cv_slots, layout.executor_threads) == (2, 3, 10)
+
+
+def test_cgroup_fraction_rounds_down_to_one_cpu():
+    layout = choose_layout({}, (0.5, "cgroup"))
+    assert (layout.workers, layout.cv_threads, layout.cv_slots) == (1, 1, 1)
+
+
+def test_rejects_non_positive_values():
+    with pytest.raises(ValueError):
+        choose_layout({"AVATAR_WORKERS": "0"}, EIGHT)
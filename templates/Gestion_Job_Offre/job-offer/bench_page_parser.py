@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML extraction on a synthetic admin job offer list
+
+Builds an `/admin/job-offer` page with N rows using the same markup as
+`admin/job_offer/list.html.twig` (title cell, view link, approve / reject /
+delete forms with per-offer CSRF tokens), then times the approve-path
+lookup two ways:
+
+- legacy: BeautifulSoup(html.parser), walk every text node for the title,
+  then scan every form for the approve action (the previous
+  `approve_job_offer_as_admin` logic)
+- parsed: one `ParsedPage` lxml parse, row lookup by title, indexed form lookup
+
+Usage:
+    python bench_page_parser.py
+    python bench_page_parser.py --rows 5000 --iterations 5
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from page_parser import ParsedPage
+
+ROW_TEMPLATE = """
+<tr>
+    <td>{id}</td>
+    <td><strong>{title}</strong></td>
+    <td>Partner {partner}</td>
+    <td><span class="badge bg-info">Full Time</span></td>
+    <td><i class="bi bi-geo-alt"></i> Tunis, Tunisia</td>
+    <td><span class="badge bg-warning">Pending</span></td>
+    <td><small class="text-muted">Not published</small></td>
+    <td>
+        <div class="btn-group btn-group-sm">
+            <a href="/admin/job-offer/{id}" class="btn btn-outline-primary" title="View Details"><i class="bi bi-eye"></i></a>
+            <form method="post" action="/admin/job-offer/{id}/approve" class="d-inline">
+                <input type="hidden" name="_token" value="approve-token-{id}">
+                <button type="submit" class="btn btn-outline-success" title="Approve"><i class="bi bi-check-lg"></i></button>
+            </form>
+            <form method="post" action="/admin/job-offer/{id}/reject" class="d-inline">
+                <input type="hidden" name="_token" value="reject-token-{id}">
+                <button type="submit" class="btn btn-outline-warning" title="Reject"><i class="bi bi-x-lg"></i></button>
+            </form>
+            <form method="post" action="/admin/job-offer/{id}/delete" class="d-inline">
+                <input type="hidden" name="_token" value="delete-token-{id}">
+                <button type="submit" class="btn btn-outline-danger" title="Delete"><i class="bi bi-trash"></i></button>
+            </form>
+        </div>
+    </td>
+</tr>"""
+
+
+def build_admin_list(rows: int) -> str:
+    body = "".join(
+        ROW_TEMPLATE.format(id=i, title=f"Job Offer #{i}", partner=i % 37)
+        for i in range(1, rows + 1)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Job Offers</title></head><body>"
+        '<form method="get" class="row g-3"><select name="status"></select></form>'
+        f'<table class="table"><thead><tr><th>ID</th><th>Title</th></tr></thead><tbody>{body}</tbody></table>'
+        "</body></html>"
+    )
+
+
+def legacy_lookup(html: str, title: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    job_offer_id = None
+    for element in soup.find_all(string=True):
+        if title in str(element):
+            # The title sits in <strong>; walk up to its row for the links
+            row = element.find_parent('tr') or soup
+            for link in row.find_all('a', href=True):
+                match = re.search(r'/admin/job-offer/(\d+)', link['href'])
+                if match:
+                    job_offer_id = match.group(1)
+                    break
+            if job_offer_id:
+                break
+    for form in soup.find_all('form'):
+        if f'/{job_offer_id}/approve' in form.get('action', ''):
+            token = form.find('input', {'name': '_token'})
+            return job_offer_id, token.get('value') if token else None
+    return job_offer_id, None
+
+
+def parsed_lookup(html: str, title: str):
+    page = ParsedPage(html)
+    job_offer_id = page.find_id_for_text(title, r'/admin/job-offer/(\d+)')
+    form = page.find_form(f'/{job_offer_id}/approve')
+    return job_offer_id, form.get('_token') if form else None
+
+
+def time_it(fn, html, title, iterations):
+    result = fn(html, title)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(html, title)
+        samples.append(time.perf_counter() - started)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction benchmark")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    html = build_admin_list(args.rows)
+    # Worst case for a scan: the target is the last row
+    title = f"Job Offer #{args.rows}"
+    print(f"📄 Synthetic admin list: {args.rows} rows, {len(html) / 1024:.0f} KiB")
+
+    legacy_result, legacy_time = time_it(legacy_lookup, html, title, args.iterations)
+    parsed_result, parsed_time = time_it(parsed_lookup, html, title, args.iterations)
+    assert legacy_result == parsed_result, (legacy_result, parsed_result)
+
+    print(f"🐢 legacy (BeautifulSoup html.parser): {legacy_time * 1000:8.1f} ms")
+    print(f"⚡ parsed (lxml ParsedPage):           {parsed_time * 1000:8.1f} ms")
+    print(f"📈 speedup: {legacy_time / parsed_time:.1f}x  (found ID {parsed_result[0]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Record/replay HTTP fixtures for the UniLearn workflow tests
+
+In record mode every request made through a test session is passed to the
+live server and the exchange is appended to a cassette. In replay mode the
+session never opens a socket: a transport adapter answers from the
+cassette, so the suites run offline in milliseconds and always see the same
+pages (a fixed workload for benchmarking the extraction code too).
+
+Cassettes are scrubbed when they are saved. Credentials, CSRF tokens and
+session cookie values are replaced with placeholders everywhere they occur.
+
+Replay matches on (method, path, query) and the occurrence of that key, and
+repeats the last recorded answer when a test asks more often than it did
+while recording (e.g. a poll). Form values a test submits that differ from
+the recorded ones (timestamped job offer titles, per-worker prefixes) are
+rebound, so later pages show the values of the current run.
+
+Environment:
+    UNILEARN_HTTP_MODE      live (default), record or replay
+    UNILEARN_CASSETTE_DIR   cassette directory (default: ./cassettes next to this file)
+
+Usage:
+    UNILEARN_HTTP_MODE=record python test_job_offer_workflow.py   # needs the server
+    UNILEARN_HTTP_MODE=replay python test_job_offer_workflow.py   # offline
+    python http_replay.py bench cassettes/standalone.json --iterations 200
+"""
+
+import argparse
+import atexit
+import base64
+import html
+import http.client
+import io
+import json
+import os
+import statistics
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+from page_parser import ParsedPage
+
+HTTP_MODES = ('live', 'record', 'replay')
+DEFAULT_CASSETTE_DIR = Path(__file__).resolve().parent / 'cassettes'
+
+# Response headers worth keeping; everything else is transport detail
+RECORDED_HEADERS = ('content-type', 'location', 'set-cookie')
+
+CREDENTIAL_FIELDS = ('_username', '_password')
+CSRF_FIELD_NAMES = ('_csrf_token', '_token')
+
+
+def is_csrf_field(name: str) -> bool:
+    return name in CSRF_FIELD_NAMES or name.endswith('[_token]')
+
+
+def is_secret_field(name: str) -> bool:
+    return name in CREDENTIAL_FIELDS or is_csrf_field(name)
+
+
+def http_mode() -> str:
+    mode = os.getenv('UNILEARN_HTTP_MODE', 'live').lower()
+    if mode not in HTTP_MODES:
+        raise ValueError(f"UNILEARN_HTTP_MODE must be one of {', '.join(HTTP_MODES)}, got {mode!r}")
+    return mode
+
+
+def cassette_path(suite: str) -> Path:
+    return Path(os.getenv('UNILEARN_CASSETTE_DIR') or DEFAULT_CASSETTE_DIR) / f'{suite}.json'
+
+
+def suite_label(suite: str) -> str:
+    """Suite name for reports: replayed runs are kept apart from live ones"""
+    mode = http_mode()
+    return suite if mode == 'live' else f'{suite}-{mode}'
+
+
+def request_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    return f"{method.upper()} {parts.path}" + (f"?{parts.query}" if parts.query else '')
+
+
+def form_pairs(body) -> List[List[str]]:
+    """Decode a form-encoded request body into [name, value] pairs"""
+    if not body:
+        return []
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    return [list(pair) for pair in parse_qsl(body, keep_blank_values=True)]
+
+
+class ReplayMiss(requests.ConnectionError):
+    """The cassette has no interaction for this request"""
+
+
+# ── Cassettes ─────────────────────────────────────────────────────────
+
+
+class Cassette:
+    """An ordered list of recorded request/response exchanges"""
+
+    def __init__(self, path: Path, interactions: Optional[List[Dict]] = None):
+        self.path = Path(path)
+        self.interactions: List[Dict] = interactions or []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> 'Cassette':
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        return cls(path, data['interactions'])
+
+    def add(self, interaction: Dict):
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def save(self):
+        with self._lock:
+            interactions = scrub(self.interactions)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            'version': 1,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'interactions': interactions,
+        }, indent=2), encoding='utf-8')
+
+
+def scrub(interactions: List[Dict]) -> List[Dict]:
+    """
+    Replace credentials, CSRF tokens and cookie values with stable
+    placeholders. Secrets are collected from submitted forms, from CSRF
+    fields on the recorded pages and from Set-Cookie headers, then removed
+    from every body, header and form value.
+    """
+    secrets: Dict[str, str] = {}
+
+    def placeholder(value: str, kind: str) -> None:
+        if len(value) >= 4 and value not in secrets:
+            secrets[value] = f'{kind}-{len(secrets) + 1}'
+
+    for item in interactions:
+        for name, value in item['request']['form']:
+            if name in CREDENTIAL_FIELDS:
+                placeholder(value, 'credential')
+            elif is_csrf_field(name):
+                placeholder(value, 'csrf-token')
+        body = item['response'].get('body')
+        if body:
+            for name, elements in ParsedPage(body).fields.items():
+                if is_csrf_field(name):
+                    for element in elements:
+                        placeholder(element.get('value') or '', 'csrf-token')
+        for name, value in item['response']['headers']:
+            if name == 'set-cookie':
+                cookie_value = value.split(';', 1)[0].partition('=')[2]
+                placeholder(cookie_value, 'cookie')
+
+    # Longest first so a secret containing another is replaced whole
+    ordered = sorted(secrets.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    def clean(text: str) -> str:
+        for secret, replacement in ordered:
+            if secret in text:
+                text = text.replace(secret, replacement)
+        return text
+
+    scrubbed = []
+    for item in interactions:
+        request, response = item['request'], item['response']
+        scrubbed.append({
+            'request': {
+                **request,
+                'url': clean(request['url']),
+                'form': [[name, clean(value)] for name, value in request['form']],
+            },
+            'response': {
+                **response,
+                'headers': [[name, clean(value)] for name, value in response['headers']],
+                **({'body': clean(response['body'])} if 'body' in response else {}),
+            },
+        })
+    return scrubbed
+
+
+# ── Adapters ──────────────────────────────────────────────────────────
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Send to the live server and append each exchange to a cassette"""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        recorded = {'status': response.status_code, 'elapsed_ms': elapsed_ms}
+        recorded['headers'] = [
+            [name, value]
+            for name in RECORDED_HEADERS
+            for value in response.raw.headers.getlist(name)
+        ]
+        try:
+            recorded['body'] = content.decode(response.encoding or 'utf-8')
+        except (UnicodeDecodeError, LookupError):
+            recorded['body_b64'] = base64.b64encode(content).decode('ascii')
+
+        self.cassette.add({
+            'request': {
+                'method': request.method,
+                'url': request.url,
+                'key': request_key(request.method, request.url),
+                'form': form_pairs(request.body),
+            },
+            'response': recorded,
+        })
+        return response
+
+
+class _ReplayedMessage:
+    """Just enough of http.client.HTTPResponse for urllib3 and cookie extraction"""
+
+    def __init__(self, msg: http.client.HTTPMessage, method: str):
+        self.msg = msg
+        self._method = method
+
+    def close(self):
+        pass
+
+    def isclosed(self) -> bool:
+        return True
+
+
+class ReplayEngine:
+    """Serve recorded interactions and rebind values the current run submits"""
+
+    def __init__(self, cassette: Cassette):
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict]] = {}
+        for item in cassette.interactions:
+            self._by_key.setdefault(item['request']['key'], []).append(item)
+        self._served: Dict[str, int] = {}
+        self.substitutions: Dict[str, str] = {}
+
+    def respond(self, method: str, url: str, body) -> Dict:
+        key = request_key(method, url)
+        with self._lock:
+            recorded = self._by_key.get(key)
+            if not recorded:
+                raise ReplayMiss(f"No recorded interaction for {key}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            item = recorded[min(index, len(recorded) - 1)]
+
+            current = dict(form_pairs(body))
+            for name, value in item['request']['form']:
+                submitted = current.get(name)
+                if value and submitted is not None and submitted != value and not is_secret_field(name):
+                    self.substitutions[value] = submitted
+                    self.substitutions[html.escape(value)] = html.escape(submitted)
+            substitutions = sorted(self.substitutions.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+        def rebind(text: str) -> str:
+            for old, new in substitutions:
+                text = text.replace(old, new)
+            return text
+
+        response = item['response']
+        if 'body_b64' in response:
+            content = base64.b64decode(response['body_b64'])
+        else:
+            content = rebind(response.get('body', '')).encode('utf-8')
+        headers = [(name, rebind(value)) for name, value in response['headers']]
+        return {'status': response['status'], 'headers': headers, 'content': content}
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering from a cassette, without any network I/O"""
+
+    def __init__(self, engine: ReplayEngine):
+        super().__init__()
+        self.engine = engine
+        self._builder = HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        answer = self.engine.respond(request.method, request.url, request.body)
+        headers = HTTPHeaderDict()
+        message = http.client.HTTPMessage()
+        for name, value in answer['headers']:
+            headers.add(name, value)
+            message[name] = value
+        headers['content-length'] = str(len(answer['content']))
+        raw = HTTPResponse(
+            body=io.BytesIO(answer['content']), headers=headers, status=answer['status'],
+            reason=http.client.responses.get(answer['status'], ''),
+            preload_content=False, decode_content=False,
+            original_response=_ReplayedMessage(message, request.method),
+        )
+        return self._builder.build_response(request, raw)
+
+    def close(self):
+        self._builder.close()
+
+
+# ── Session wiring ────────────────────────────────────────────────────
+
+_cassettes: Dict[Path, Cassette] = {}
+_engines: Dict[Path, ReplayEngine] = {}
+_registry_lock = threading.Lock()
+
+
+def _save_all():
+    for cassette in _cassettes.values():
+        if cassette.interactions:
+            cassette.save()
+
+
+def install(session: requests.Session, suite: str) -> requests.Session:
+    """
+    Mount the record or replay adapter for UNILEARN_HTTP_MODE on `session`.
+    All sessions of a suite share one cassette (`<suite>.json`); recorded
+    cassettes are saved when the process exits.
+    """
+    mode = http_mode()
+    if mode == 'live':
+        return session
+
+    path = cassette_path(suite)
+    with _registry_lock:
+        if mode == 'record':
+            if not _cassettes:
+                atexit.register(_save_all)
+            adapter = RecordingAdapter(_cassettes.setdefault(path, Cassette(path)))
+        else:
+            if path not in _engines:
+                if not path.exists():
+                    raise FileNotFoundError(
+                        f"No cassette at {path}; record one with UNILEARN_HTTP_MODE=record")
+                _engines[path] = ReplayEngine(Cassette.load(path))
+            adapter = ReplayAdapter(_engines[path])
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# ── Extraction benchmark ──────────────────────────────────────────────
+
+
+def bench_extraction(cassette: Cassette, iterations: int) -> Dict[str, float]:
+    """Time ParsedPage parsing plus the lookups the tests do over every recorded page"""
+    pages = [item['response']['body'] for item in cassette.interactions
+             if item['response'].get('body', '').lstrip().startswith('<')]
+    if not pages:
+        raise ValueError("cassette contains no HTML pages")
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        for body in pages:
+            page = ParsedPage(body)
+            page.csrf_field()
+            page.forms
+            page.links
+        samples.append(time.perf_counter() - started)
+    return {
+        'pages': len(pages),
+        'bytes': sum(len(body) for body in pages),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay cassette tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    bench = commands.add_parser('bench', help='benchmark page extraction over a cassette')
+    bench.add_argument('cassette')
+    bench.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    result = bench_extraction(Cassette.load(Path(args.cassette)), args.iterations)
+    print(f"📼 {result['pages']} recorded pages, {result['bytes'] / 1024:.1f} KiB")
+    print(f"⚡ parse + extract all pages: median {result['median_ms']} ms, "
+          f"min {result['min_ms']} ms ({args.iterations} iterations)")
+
+
+if __name__ == "__main__":
+    main()
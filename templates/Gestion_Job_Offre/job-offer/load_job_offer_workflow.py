@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Concurrent load driver for the UniLearn Job Offer Workflow
+
+Runs N independent virtual users, each one a quiet UniLearnTester with its
+own requests.Session (and therefore its own cookie jar), ramped up over a
+configurable period. Every virtual user performs the full workflow:
+
+1. Partner logs in and creates a job offer
+2. Admin logs in, loads the admin job offer list and approves the offer
+   from its detail page (`/admin/job-offer/{id}`, ID taken from the partner
+   list), so approval never depends on the offer still being on the first
+   admin list page
+
+Each HTTP request is timed and attributed to a workflow step, and the run
+ends with throughput plus p50/p95/p99 latency per step.
+
+Usage:
+    python load_job_offer_workflow.py --users 200 --ramp-up 60
+    python load_job_offer_workflow.py --users 50 --accounts partners.csv --json report.json
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from perf_report import classify_request, percentile
+from test_job_offer_workflow import STANDALONE_TITLE_PREFIX, UniLearnTester, load_partner_accounts
+
+PARTNER_PAGE_SIZE = 20  # PartnerJobOfferController::list $limit
+
+
+class StepStats:
+    """Thread-safe collection of per-step request timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, step: str, elapsed: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(step, []).append(elapsed)
+            if not ok:
+                self.errors[step] = self.errors.get(step, 0) + 1
+
+    def summary(self, wall_time: float) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for step, values in self.samples.items():
+                result[step] = {
+                    'count': len(values),
+                    'errors': self.errors.get(step, 0),
+                    'throughput_per_s': round(len(values) / wall_time, 3),
+                    'p50_ms': round(percentile(values, 50) * 1000, 1),
+                    'p95_ms': round(percentile(values, 95) * 1000, 1),
+                    'p99_ms': round(percentile(values, 99) * 1000, 1),
+                    'max_ms': round(max(values) * 1000, 1),
+                }
+            return result
+
+
+class StepTimingSession(requests.Session):
+    """requests.Session that times every request into a StepStats"""
+
+    def __init__(self, stats: StepStats):
+        super().__init__()
+        self.stats = stats
+
+    def request(self, method, url, *args, **kwargs):
+        step = classify_request(method, url)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            self.stats.record(step, time.perf_counter() - started, False)
+            raise
+        self.stats.record(step, time.perf_counter() - started, response.status_code < 400)
+        return response
+
+
+def run_virtual_user(user_id: int, base_url: str, partner: Optional[Dict[str, str]],
+                     stats: StepStats) -> bool:
+    """Run one partner-create → admin-approve workflow; return success"""
+    tester = UniLearnTester(base_url, session=StepTimingSession(stats), verbose=False)
+    if partner:
+        tester.partner_credentials = partner
+    # Titles only carry a per-second timestamp; namespace them per user
+    title = tester.test_job_offer['title'].removeprefix(STANDALONE_TITLE_PREFIX)
+    tester.test_job_offer['title'] = f'[load-vu-{user_id}] {title}'
+
+    try:
+        created = (
+            tester.login_user(tester.partner_credentials['email'],
+                              tester.partner_credentials['password'], 'Partner')
+            and tester.create_job_offer_as_partner()
+        )
+        tester.logout_user()
+        if not created:
+            return False
+
+        approved = (
+            tester.login_user(tester.admin_credentials['email'],
+                              tester.admin_credentials['password'], 'Admin')
+            # Load the admin list as an admin would (timed as `admin list`);
+            # approval itself goes through the offer's detail page
+            and tester.session.get(f"{tester.base_url}/admin/job-offer").status_code == 200
+            and tester.approve_job_offer_from_detail_page()
+        )
+        tester.logout_user()
+        return approved
+    except requests.RequestException:
+        return False
+    finally:
+        tester.session.close()
+
+
+def run_load(base_url: str, users: int, ramp_up: float,
+             accounts: List[Dict[str, str]]) -> Dict[str, object]:
+    """Start `users` virtual users evenly over `ramp_up` seconds and wait for all"""
+    stats = StepStats()
+    interval = ramp_up / users if users > 1 else 0.0
+    futures = []
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for user_id in range(users):
+            target = started + user_id * interval
+            time.sleep(max(0.0, target - time.perf_counter()))
+            partner = accounts[user_id % len(accounts)] if accounts else None
+            futures.append(pool.submit(run_virtual_user, user_id, base_url, partner, stats))
+        outcomes = [f.result() for f in futures]
+    wall_time = time.perf_counter() - started
+
+    succeeded = sum(outcomes)
+    return {
+        'users': users,
+        'ramp_up_s': ramp_up,
+        'wall_time_s': round(wall_time, 2),
+        'workflows_succeeded': succeeded,
+        'workflows_failed': users - succeeded,
+        'workflows_per_s': round(succeeded / wall_time, 3),
+        'steps': stats.summary(wall_time),
+    }
+
+
+def print_report(report: Dict[str, object]):
+    print("=" * 78)
+    print(f"📊 {report['users']} virtual users, ramp-up {report['ramp_up_s']}s, "
+          f"wall time {report['wall_time_s']}s")
+    print(f"✅ workflows succeeded: {report['workflows_succeeded']}   "
+          f"❌ failed: {report['workflows_failed']}   "
+          f"⚡ {report['workflows_per_s']} workflows/s")
+    print("=" * 78)
+    print(f"{'step':<16}{'count':>7}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step, s in sorted(report['steps'].items()):
+        print(f"{step:<16}{s['count']:>7}{s['errors']:>8}{s['throughput_per_s']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent job offer workflow load driver")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10, help='number of virtual users')
+    parser.add_argument('--ramp-up', type=float, default=10.0,
+                        help='seconds over which users are started')
+    parser.add_argument('--accounts', help='CSV file of partner `email,password` rows')
+    parser.add_argument('--json', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    accounts = load_partner_accounts(args.accounts) if args.accounts else []
+    users_per_account = math.ceil(args.users / max(1, len(accounts)))
+    if users_per_account > PARTNER_PAGE_SIZE:
+        # Each user finds its offer's ID on the first partner list page; with
+        # more concurrent users per account than that page holds, offers
+        # can drop off it before their user looks
+        print(f"⚠️ {users_per_account} virtual users per partner account but the partner list "
+              f"shows {PARTNER_PAGE_SIZE} offers: pass --accounts with at least "
+              f"{math.ceil(args.users / PARTNER_PAGE_SIZE)} accounts for reliable ID lookups")
+    print(f"🚀 Starting {args.users} virtual users against {args.base_url}")
+    report = run_load(args.base_url, args.users, args.ramp_up, accounts)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+
+    return report['workflows_failed'] == 0
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Single-parse HTML extraction helpers for the UniLearn workflow tests
+
+Each response is parsed exactly once with lxml and the fields, forms and
+links the tests need are indexed up front, so CSRF tokens, form field
+names and job offer IDs are dictionary lookups instead of repeated
+BeautifulSoup scans over the whole page.
+
+Usage:
+    page = ParsedPage(response.text)
+    token = page.csrf_token()
+    name = page.resolve_field('title', ['job_offer_form_type[title]'])
+    offer_id = page.find_id_for_text(title, r'/admin/job-offer/(\\d+)')
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import lxml.html
+from lxml import etree
+
+FIELD_TAGS = ('input', 'textarea', 'select')
+
+# Checked in order; Symfony form types also nest the token as `<form>[_token]`
+CSRF_FIELD_NAMES = ('_csrf_token', '_token')
+
+
+class ParsedForm:
+    """A form element with its action and field values"""
+
+    def __init__(self, element):
+        self.element = element
+        self.action = element.get('action', '')
+        self.name = element.get('name')
+        self.fields: Dict[str, str] = {}
+        for field in element.iter(*FIELD_TAGS):
+            name = field.get('name')
+            if name and name not in self.fields:
+                self.fields[name] = field.get('value', '')
+
+    def get(self, name: str) -> Optional[str]:
+        return self.fields.get(name)
+
+
+class ParsedPage:
+    """One lxml parse of an HTML page plus lazily built indexes"""
+
+    def __init__(self, html: str):
+        try:
+            self.root = lxml.html.fromstring(html) if html and html.strip() else None
+        except (etree.ParserError, ValueError):
+            self.root = None
+        self._fields: Optional[Dict[str, List]] = None
+        self._forms: Optional[List[ParsedForm]] = None
+        self._links: Optional[List[Tuple[str, str]]] = None
+
+    # ── Indexes ────────────────────────────────────────────────────────
+
+    @property
+    def fields(self) -> Dict[str, List]:
+        """Field name → elements, in document order"""
+        if self._fields is None:
+            self._fields = {}
+            if self.root is not None:
+                for element in self.root.iter(*FIELD_TAGS):
+                    name = element.get('name')
+                    if name:
+                        self._fields.setdefault(name, []).append(element)
+        return self._fields
+
+    @property
+    def forms(self) -> List[ParsedForm]:
+        if self._forms is None:
+            self._forms = [] if self.root is None else [
+                ParsedForm(form) for form in self.root.iter('form')
+            ]
+        return self._forms
+
+    @property
+    def links(self) -> List[Tuple[str, str]]:
+        """(href, text) for every anchor with an href"""
+        if self._links is None:
+            self._links = [] if self.root is None else [
+                (a.get('href'), a.text_content())
+                for a in self.root.iter('a') if a.get('href')
+            ]
+        return self._links
+
+    # ── Lookups ────────────────────────────────────────────────────────
+
+    def csrf_field(self) -> Optional[Tuple[str, str]]:
+        """Return (field name, value) of the page's CSRF token, if any"""
+        for name in CSRF_FIELD_NAMES:
+            if name in self.fields:
+                return name, self.fields[name][0].get('value')
+        for name, elements in self.fields.items():
+            if name.endswith('[_token]'):
+                return name, elements[0].get('value')
+        return None
+
+    def csrf_token(self) -> Optional[str]:
+        field = self.csrf_field()
+        return field[1] if field else None
+
+    def field_value(self, name: str) -> Optional[str]:
+        elements = self.fields.get(name)
+        return elements[0].get('value') if elements else None
+
+    def resolve_field(self, field_key: str, candidates: Iterable[str] = ()) -> Optional[str]:
+        """
+        Return the actual name of a form field: the first candidate name
+        present on the page, else the first field whose name contains
+        `field_key`.
+        """
+        for name in candidates:
+            if name in self.fields:
+                return name
+        for name in self.fields:
+            if field_key in name.lower():
+                return name
+        return None
+
+    def find_form(self, action_contains: str) -> Optional[ParsedForm]:
+        """First form whose action contains `action_contains`"""
+        if self.root is None:
+            return None
+        matches = self.root.xpath('(//form[contains(@action, $a)])[1]', a=action_contains)
+        return ParsedForm(matches[0]) if matches else None
+
+    def find_id_for_text(self, text: str, href_pattern: str) -> Optional[str]:
+        """
+        Find an ID for the link, or the table row with a cell, whose whole
+        (whitespace-normalised) text is `text`: the first link href or form
+        action matching `href_pattern`. Titles that merely contain `text`
+        (`Offer #1` vs `Offer #10`, another run's prefixed title) never match.
+        """
+        if self.root is None:
+            return None
+        pattern = re.compile(href_pattern)
+        text = ' '.join(text.split())
+
+        for href, link_text in self.links:
+            if ' '.join(link_text.split()) == text:
+                match = pattern.search(href)
+                if match:
+                    return match.group(1)
+
+        for row in self.root.xpath('//tr[.//*[normalize-space(.) = $text]]', text=text):
+            for target in row.xpath('.//a/@href | .//form/@action'):
+                match = pattern.search(target)
+                if match:
+                    return match.group(1)
+        return None
+
+    def contains_text(self, text: str) -> bool:
+        if self.root is None:
+            return False
+        return bool(self.root.xpath('boolean(//text()[contains(., $text)])', text=text))
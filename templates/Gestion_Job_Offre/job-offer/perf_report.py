@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Per-step performance reports for the UniLearn job offer workflow tests
+
+`RecordingSession` is a requests.Session that times every HTTP call and
+records its workflow step, status code and payload sizes into a
+`PerfRecorder`. At the end of a run `finish_run()` aggregates the calls per
+step, writes `<suite>.json` and `<suite>.html`, and compares each step's
+median latency against the stored baseline `<suite>.baseline.json`. A step
+is a regression when its median grows by more than the threshold (relative)
+and by at least a minimum number of milliseconds (so that noise on 3 ms
+steps does not fail the run).
+
+Environment:
+    UNILEARN_PERF_DIR             report directory (default: ./perf_reports next to this file)
+    UNILEARN_PERF_THRESHOLD       allowed relative median growth (default: 0.25 = +25%)
+    UNILEARN_PERF_MIN_DELTA_MS    ignore regressions smaller than this (default: 10)
+    UNILEARN_PERF_UPDATE_BASELINE set to 1 to store this run as the new baseline
+
+Usage:
+    python perf_report.py perf_reports/standalone.json
+    python perf_report.py perf_reports/standalone.json --baseline old.json --threshold 0.1
+    python perf_report.py perf_reports/standalone.json --promote   # accept as baseline
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+DEFAULT_REPORT_DIR = Path(__file__).resolve().parent / 'perf_reports'
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 10.0
+
+# (step name, method, path pattern) — first match wins
+STEP_PATTERNS = [
+    ('login GET', 'GET', re.compile(r'^/login$')),
+    ('login POST', 'POST', re.compile(r'^/login$')),
+    ('logout', 'GET', re.compile(r'^/logout$')),
+    ('new offer GET', 'GET', re.compile(r'^/partner/job-offers/new$')),
+    ('new offer POST', 'POST', re.compile(r'^/partner/job-offers/new$')),
+    ('partner list', 'GET', re.compile(r'^/partner/job-offers$')),
+    ('admin list', 'GET', re.compile(r'^/admin/job-offer$')),
+    ('admin offer', 'GET', re.compile(r'^/admin/job-offer/\d+$')),
+    ('approve', 'POST', re.compile(r'^/admin/job-offer/\d+/approve$')),
+]
+
+
+def classify_request(method: str, url: str) -> str:
+    """Map a request to its workflow step name"""
+    path = urlsplit(url).path
+    for step, step_method, pattern in STEP_PATTERNS:
+        if method.upper() == step_method and pattern.match(path):
+            return step
+    return f'{method.upper()} {path}'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+@dataclass
+class CallRecord:
+    """One HTTP call as seen by the test session"""
+    step: str
+    method: str
+    path: str
+    status: Optional[int]
+    elapsed_ms: float
+    request_bytes: int
+    response_bytes: int
+    redirects: int = 0
+    error: Optional[str] = None
+
+
+class PerfRecorder:
+    """Thread-safe list of CallRecords plus per-step aggregation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[CallRecord] = []
+        self.started_at = datetime.now()
+
+    def record(self, call: CallRecord):
+        with self._lock:
+            self.calls.append(call)
+
+    def steps_summary(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            calls = list(self.calls)
+        by_step: Dict[str, List[CallRecord]] = {}
+        for call in calls:
+            by_step.setdefault(call.step, []).append(call)
+
+        summary = {}
+        for step, step_calls in by_step.items():
+            times = [c.elapsed_ms for c in step_calls]
+            sizes = [c.response_bytes for c in step_calls]
+            statuses: Dict[str, int] = {}
+            for c in step_calls:
+                key = str(c.status) if c.status is not None else 'error'
+                statuses[key] = statuses.get(key, 0) + 1
+            summary[step] = {
+                'count': len(step_calls),
+                'errors': sum(1 for c in step_calls if c.status is None or c.status >= 400),
+                'median_ms': round(median(times), 1),
+                'p95_ms': round(percentile(times, 95), 1),
+                'max_ms': round(max(times), 1),
+                'median_response_bytes': int(median(sizes)),
+                'total_response_bytes': sum(sizes),
+                'statuses': statuses,
+            }
+        return summary
+
+    def report(self, suite: str, **meta) -> Dict[str, object]:
+        with self._lock:
+            calls = [asdict(c) for c in self.calls]
+        return {
+            'suite': suite,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            **meta,
+            'total_calls': len(calls),
+            'total_http_ms': round(sum(c['elapsed_ms'] for c in calls), 1),
+            'steps': self.steps_summary(),
+            'calls': calls,
+        }
+
+
+class RecordingSession(requests.Session):
+    """requests.Session that records every call into a PerfRecorder"""
+
+    def __init__(self, recorder: Optional[PerfRecorder] = None):
+        super().__init__()
+        self.recorder = recorder if recorder is not None else PerfRecorder()
+
+    def request(self, method, url, *args, **kwargs):
+        step = classify_request(method, url)
+        path = urlsplit(url).path
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            self.recorder.record(CallRecord(
+                step, method.upper(), path, None,
+                round((time.perf_counter() - started) * 1000, 2), 0, 0, error=type(e).__name__,
+            ))
+            raise
+        # Includes redirects followed and reading the whole body
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        first_request = response.history[0].request if response.history else response.request
+        body = first_request.body or b''
+        self.recorder.record(CallRecord(
+            step, method.upper(), path, response.status_code, elapsed_ms,
+            len(body.encode() if isinstance(body, str) else body),
+            len(response.content), len(response.history),
+        ))
+        return response
+
+
+# ── Baseline comparison ───────────────────────────────────────────────
+
+
+def find_regressions(report: Dict[str, object], baseline: Dict[str, object],
+                     threshold: float = DEFAULT_THRESHOLD,
+                     min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[Dict[str, object]]:
+    """Steps whose median latency grew by more than `threshold` and `min_delta_ms`"""
+    regressions = []
+    for step, current in report['steps'].items():
+        previous = baseline.get('steps', {}).get(step)
+        if not previous:
+            continue
+        before, after = previous['median_ms'], current['median_ms']
+        if after - before >= min_delta_ms and after > before * (1 + threshold):
+            regressions.append({
+                'step': step,
+                'baseline_ms': before,
+                'current_ms': after,
+                'change_pct': round((after / before - 1) * 100, 1) if before else None,
+            })
+    return regressions
+
+
+def write_html(report: Dict[str, object], path: Path,
+               regressions: List[Dict[str, object]] = (),
+               baseline: Optional[Dict[str, object]] = None):
+    """Render a report (and its comparison, if any) as a standalone HTML page"""
+    regressed = {r['step'] for r in regressions}
+    baseline_steps = (baseline or {}).get('steps', {})
+    esc = html.escape
+
+    step_rows = []
+    for step, s in sorted(report['steps'].items()):
+        before = baseline_steps.get(step, {}).get('median_ms', '')
+        style = ' style="background:#f8d7da"' if step in regressed else ''
+        statuses = ', '.join(f'{k}×{v}' for k, v in sorted(s['statuses'].items()))
+        step_rows.append(
+            f'<tr{style}><td>{esc(step)}</td><td>{s["count"]}</td><td>{s["errors"]}</td>'
+            f'<td>{s["median_ms"]}</td><td>{before}</td><td>{s["p95_ms"]}</td><td>{s["max_ms"]}</td>'
+            f'<td>{s["median_response_bytes"]}</td><td>{esc(statuses)}</td></tr>'
+        )
+    call_rows = [
+        f'<tr><td>{esc(c["step"])}</td><td>{esc(c["method"])}</td><td>{esc(c["path"])}</td>'
+        f'<td>{c["status"] if c["status"] is not None else esc(c["error"] or "")}</td>'
+        f'<td>{c["elapsed_ms"]}</td><td>{c["request_bytes"]}</td><td>{c["response_bytes"]}</td>'
+        f'<td>{c["redirects"]}</td></tr>'
+        for c in report['calls']
+    ]
+    verdict = (f'<p style="color:#b02a37">❌ {len(regressions)} step(s) regressed</p>'
+               if regressions else '<p style="color:#146c43">✅ No regressions</p>')
+
+    path.write_text(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{esc(report['suite'])} performance</title>
+<style>body{{font-family:sans-serif}} table{{border-collapse:collapse;margin-bottom:2em}}
+td,th{{border:1px solid #ccc;padding:4px 8px;text-align:right}} td:first-child{{text-align:left}}</style>
+</head><body>
+<h1>{esc(report['suite'])} — {esc(report['started_at'])}</h1>
+<p>{report['total_calls']} HTTP calls, {report['total_http_ms']} ms total</p>
+{verdict if baseline else '<p>No baseline to compare against</p>'}
+<h2>Steps</h2>
+<table><tr><th>step</th><th>count</th><th>errors</th><th>median ms</th><th>baseline ms</th>
+<th>p95 ms</th><th>max ms</th><th>median bytes</th><th>statuses</th></tr>
+{''.join(step_rows)}</table>
+<h2>Calls</h2>
+<table><tr><th>step</th><th>method</th><th>path</th><th>status</th><th>ms</th>
+<th>request bytes</th><th>response bytes</th><th>redirects</th></tr>
+{''.join(call_rows)}</table>
+</body></html>
+""", encoding='utf-8')
+
+
+def baseline_rejection(report: Dict[str, object]) -> Optional[str]:
+    """
+    Why `report` must not become a baseline, or None if it may: a failed
+    run (`passed` false) or a step with error responses is fast for the
+    wrong reasons and would hide later regressions.
+    """
+    if not report.get('passed', True):
+        return 'the run failed'
+    failing = sorted(step for step, s in report['steps'].items() if s['errors'])
+    if failing:
+        return f"step(s) with errors: {', '.join(failing)}"
+    return None
+
+
+def finish_run(recorder: PerfRecorder, suite: str, log=print, **meta) -> bool:
+    """
+    Write `<suite>.json` / `<suite>.html`, compare against the suite's
+    baseline and print the verdict. Return False if any step regressed.
+    The first run for a suite (or UNILEARN_PERF_UPDATE_BASELINE=1) stores
+    the report as the baseline, unless `baseline_rejection` objects.
+    """
+    out_dir = Path(os.getenv('UNILEARN_PERF_DIR') or DEFAULT_REPORT_DIR)
+    threshold = float(os.getenv('UNILEARN_PERF_THRESHOLD', DEFAULT_THRESHOLD))
+    min_delta_ms = float(os.getenv('UNILEARN_PERF_MIN_DELTA_MS', DEFAULT_MIN_DELTA_MS))
+    update_baseline = os.getenv('UNILEARN_PERF_UPDATE_BASELINE') == '1'
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    report = recorder.report(suite, **meta)
+    report_file = out_dir / f'{suite}.json'
+    baseline_file = out_dir / f'{suite}.baseline.json'
+    report_file.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    baseline = None
+    regressions: List[Dict[str, object]] = []
+    if baseline_file.exists() and not update_baseline:
+        baseline = json.loads(baseline_file.read_text(encoding='utf-8'))
+        regressions = find_regressions(report, baseline, threshold, min_delta_ms)
+    write_html(report, out_dir / f'{suite}.html', regressions, baseline)
+
+    log(f"📊 {report['total_calls']} HTTP calls, {report['total_http_ms']} ms — report: {report_file}")
+    if baseline is None:
+        rejection = baseline_rejection(report)
+        if rejection:
+            log(f"⚠️ Not storing this run as the {suite} baseline: {rejection}")
+        else:
+            shutil.copyfile(report_file, baseline_file)
+            log(f"📌 Stored this run as the {suite} baseline: {baseline_file}")
+        return True
+    for r in regressions:
+        log(f"🐢 {r['step']}: median {r['baseline_ms']} ms → {r['current_ms']} ms (+{r['change_pct']}%)")
+    if regressions:
+        log(f"❌ {len(regressions)} step(s) regressed by more than {threshold:.0%} against {baseline_file}")
+        return False
+    log(f"✅ No step regressed by more than {threshold:.0%} against the baseline")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a workflow performance report with its baseline")
+    parser.add_argument('report', help='report JSON written by a test run')
+    parser.add_argument('--baseline', help='baseline JSON (default: <suite>.baseline.json next to the report)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument('--promote', action='store_true', help='store the report as the new baseline')
+    args = parser.parse_args()
+
+    report_file = Path(args.report)
+    report = json.loads(report_file.read_text(encoding='utf-8'))
+    baseline_file = Path(args.baseline) if args.baseline else \
+        report_file.with_name(f"{report['suite']}.baseline.json")
+
+    if args.promote:
+        rejection = baseline_rejection(report)
+        if rejection:
+            print(f"❌ Not promoting {report_file}: {rejection}")
+            return False
+        shutil.copyfile(report_file, baseline_file)
+        print(f"📌 {report_file} is now the baseline ({baseline_file})")
+        return True
+
+    baseline = json.loads(baseline_file.read_text(encoding='utf-8'))
+    regressions = find_regressions(report, baseline, args.threshold, args.min_delta_ms)
+    print(f"{'step':<16}{'baseline ms':>13}{'current ms':>12}")
+    for step, s in sorted(report['steps'].items()):
+        before = baseline.get('steps', {}).get(step, {}).get('median_ms', '-')
+        marker = '  🐢' if any(r['step'] == step for r in regressions) else ''
+        print(f"{step:<16}{before:>13}{s['median_ms']:>12}{marker}")
+    write_html(report, report_file.with_suffix('.html'), regressions, baseline)
+    print(f"{'❌' if regressions else '✅'} {len(regressions)} regression(s) at threshold {args.threshold:.0%}")
+    return not regressions
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Condition-based waiting for the UniLearn workflow tests
+
+Use these instead of fixed `time.sleep()` calls: the condition is polled
+with exponential backoff until it returns a truthy value or an overall
+deadline passes, so a test continues as soon as the state is reached. Every
+wait reports how long it actually took and how many attempts it made.
+
+Usage:
+    result = wait_until(lambda: server_is_up(), timeout=10, description="server ready")
+    if not result:
+        print(f"gave up after {result.elapsed:.2f}s: {result.last_error}")
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple, Type
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a wait: truthy when the condition was met"""
+    ok: bool
+    value: Any
+    elapsed: float
+    attempts: int
+    description: str
+    last_error: Optional[BaseException] = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def summary(self) -> str:
+        state = "ready" if self.ok else "timed out"
+        return (f"⏱️ {self.description}: {state} after {self.elapsed:.2f}s "
+                f"({self.attempts} attempt{'s' if self.attempts != 1 else ''})")
+
+
+def wait_until(condition: Callable[[], Any],
+               timeout: float = 30.0,
+               interval: float = 0.1,
+               max_interval: float = 2.0,
+               backoff: float = 2.0,
+               description: str = "condition",
+               ignore: Tuple[Type[BaseException], ...] = (),
+               sleep: Callable[[float], None] = time.sleep,
+               clock: Callable[[], float] = time.monotonic) -> WaitResult:
+    """
+    Poll `condition` until it returns a truthy value or `timeout` seconds
+    pass. The delay between attempts starts at `interval` and is
+    multiplied by `backoff` up to `max_interval`. It never sleeps past the
+    deadline. Exceptions listed in `ignore` count as "not yet"; the last
+    one is kept on the result.
+    """
+    started = clock()
+    deadline = started + timeout
+    delay = interval
+    attempts = 0
+    last_error = None
+
+    while True:
+        attempts += 1
+        try:
+            value = condition()
+        except ignore as e:
+            value, last_error = None, e
+        if value:
+            return WaitResult(True, value, clock() - started, attempts, description, last_error)
+
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return WaitResult(False, value, clock() - started, attempts, description, last_error)
+        sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_interval)
@@ -3,28 +3,71 @@
 Setup and run script for UniLearn Job Offer Workflow Tests
 
 This script will:
-1. Install required dependencies
+1. Install required dependencies (skipped when already satisfied)
 2. Check if the UniLearn server is running
-3. Run the job offer workflow tests
+3. Run the standalone and pytest workflow suites concurrently
 
 Usage:
     python run_tests.py
+    python run_tests.py --workers 4 --accounts partners.csv
 """
 
+import argparse
+import importlib.util
+import os
+import re
 import subprocess
 import sys
+import time
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 
-def install_dependencies():
+from polling import wait_until
+
+HERE = Path(__file__).resolve().parent
+
+def find_requirements_file():
+    """Locate test_requirements.txt (current directory, this folder or the project root)"""
+    for candidate in (Path("test_requirements.txt"),
+                      HERE / "test_requirements.txt",
+                      HERE.parents[2] / "test_requirements.txt"):
+        if candidate.exists():
+            return candidate
+    return None
+
+def requirements_satisfied(requirements_file):
+    """Return True when every pinned requirement is installed at that version"""
+    for line in requirements_file.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = re.match(r"^([A-Za-z0-9_.\-]+)(\[[^\]]*\])?\s*(==\s*(\S+))?", line)
+        if not match:
+            return False
+        name, pinned = match.group(1), match.group(4)
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return False
+        if pinned and installed != pinned:
+            return False
+    return True
+
+def install_dependencies(requirements_file):
     """Install required Python packages"""
+    if requirements_satisfied(requirements_file):
+        print("✅ Test dependencies already satisfied - skipping installation")
+        return True
+    
     print("📦 Installing test dependencies...")
     
     try:
         subprocess.check_call([
             sys.executable, "-m", "pip", "install", 
-            "-r", "test_requirements.txt"
+            "-r", str(requirements_file)
         ])
         print("✅ Dependencies installed successfully")
         return True
@@ -32,87 +75,113 @@ def install_dependencies():
         print(f"❌ Failed to install dependencies: {e}")
         return False
 
-def check_server_status(base_url="http://127.0.0.1:8000"):
-    """Check if UniLearn server is running"""
+def probe_login_page(base_url, request_timeout):
+    """Return the /login status code; raises RequestException if unreachable"""
+    return requests.get(f"{base_url}/login", timeout=request_timeout).status_code
+
+def check_server_status(base_url="http://127.0.0.1:8000", wait=30.0):
+    """Check if UniLearn server is running, polling up to `wait` seconds for it to come up"""
     print(f"🌐 Checking server status at {base_url}...")
     
-    try:
-        response = requests.get(f"{base_url}/login", timeout=5)
-        if response.status_code == 200:
-            print("✅ UniLearn server is running")
-            return True
-        else:
-            print(f"⚠️ Server responded with status code: {response.status_code}")
+    last = {}
+    
+    def server_ready():
+        try:
+            last['status'] = probe_login_page(base_url, request_timeout=5)
+        except requests.exceptions.RequestException as e:
+            last.update(status=None, error=e)
             return False
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Server is not accessible: {e}")
+        return last['status'] == 200
+    
+    result = wait_until(server_ready, timeout=wait, interval=0.25, description="server ready")
+    print(result.summary())
+    
+    if result:
+        print("✅ UniLearn server is running")
+        return True
+    if last.get('status') is not None:
+        print(f"⚠️ Server responded with status code: {last['status']}")
+    else:
+        print(f"❌ Server is not accessible: {last.get('error')}")
         print("💡 Please start the UniLearn server with: symfony server:start")
-        return False
+    return False
 
-def run_standalone_test():
-    """Run the standalone test script"""
-    print("🧪 Running standalone job offer workflow test...")
-    
+def run_suite(name, command, env):
+    """Run one suite as a subprocess; return (success, seconds, output)"""
+    started = time.perf_counter()
     try:
-        result = subprocess.run([
-            sys.executable, "test_job_offer_workflow.py"
-        ], capture_output=True, text=True)
-        
-        print("STDOUT:", result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
-        
-        if result.returncode == 0:
-            print("✅ Standalone test passed")
-            return True
-        else:
-            print(f"❌ Standalone test failed with exit code: {result.returncode}")
-            return False
+        result = subprocess.run(command, cwd=HERE, env=env, capture_output=True, text=True)
     except Exception as e:
-        print(f"💥 Error running standalone test: {e}")
-        return False
+        return False, time.perf_counter() - started, f"💥 Error running {name}: {e}"
+    
+    output = "STDOUT: " + result.stdout
+    if result.stderr:
+        output += "\nSTDERR: " + result.stderr
+    return result.returncode == 0, time.perf_counter() - started, output
 
-def run_pytest_tests():
-    """Run pytest tests"""
+def suite_environment(accounts_file, account_offset):
+    """Environment for a suite: which partner accounts it may use"""
+    env = dict(os.environ)
+    if accounts_file:
+        env["UNILEARN_PARTNER_ACCOUNTS"] = str(Path(accounts_file).resolve())
+        env["UNILEARN_ACCOUNT_OFFSET"] = str(account_offset)
+    return env
+
+def run_standalone_test(accounts_file=None):
+    """Run the standalone test script (first partner account)"""
+    print("🧪 Running standalone job offer workflow test...")
+    return run_suite(
+        "standalone test",
+        [sys.executable, "test_job_offer_workflow.py"],
+        suite_environment(accounts_file, 0),
+    )
+
+def run_pytest_tests(workers=0, accounts_file=None):
+    """Run pytest tests, distributed over pytest-xdist workers when requested"""
     print("🧪 Running pytest workflow tests...")
-    
-    try:
-        result = subprocess.run([
-            sys.executable, "-m", "pytest", 
-            "test_job_offer_workflow_pytest.py", 
-            "-v", "-s"
-        ], capture_output=True, text=True)
-        
-        print("STDOUT:", result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
-        
-        if result.returncode == 0:
-            print("✅ Pytest tests passed")
-            return True
+    command = [
+        sys.executable, "-m", "pytest", 
+        "test_job_offer_workflow_pytest.py", 
+        "-v", "-s"
+    ]
+    if workers > 1:
+        if importlib.util.find_spec("xdist") is None:
+            print("⚠️ pytest-xdist is not installed - running pytest serially")
         else:
-            print(f"❌ Pytest tests failed with exit code: {result.returncode}")
-            return False
-    except Exception as e:
-        print(f"💥 Error running pytest tests: {e}")
-        return False
+            command += ["-n", str(workers)]
+    # Pytest workers take the accounts after the standalone test's one
+    return run_suite("pytest tests", command, suite_environment(accounts_file, 1))
 
-def main():
+def main(argv=None):
     """Main function"""
+    parser = argparse.ArgumentParser(description="UniLearn job offer workflow test runner")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="distribute pytest over N pytest-xdist workers")
+    parser.add_argument("--accounts",
+                        help="CSV of pre-provisioned partner `email,password` rows, one per worker")
+    parser.add_argument("--server-wait", type=float, default=30.0,
+                        help="seconds to keep polling for the server before giving up")
+    args = parser.parse_args(argv)
+    
     print("🚀 UniLearn Job Offer Workflow Test Runner")
     print("=" * 60)
     
     # Check if requirements file exists
-    if not Path("test_requirements.txt").exists():
+    requirements_file = find_requirements_file()
+    if requirements_file is None:
         print("❌ test_requirements.txt not found")
         return False
     
     # Install dependencies
-    if not install_dependencies():
+    if not install_dependencies(requirements_file):
         return False
     
-    # Check server status
-    if not check_server_status():
+    # Check server status (replayed runs never talk to it). http_replay pulls
+    # in lxml, so it can only be imported once dependencies are installed.
+    from http_replay import http_mode
+    if http_mode() == 'replay':
+        print("📼 Replay mode: serving recorded responses, no server needed")
+    elif not check_server_status(wait=args.server_wait):
         print("💡 Please ensure UniLearn server is running before running tests")
         return False
     
@@ -120,23 +189,37 @@ def main():
     print("🎮 Running Tests")
     print("=" * 60)
     
-    # Run tests
-    standalone_success = run_standalone_test()
-    pytest_success = run_pytest_tests()
+    # Run both suites at the same time; each uses its own partner account(s)
+    # and job offer title namespace, so they do not collide
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        standalone = pool.submit(run_standalone_test, args.accounts)
+        pytest_run = pool.submit(run_pytest_tests, args.workers, args.accounts)
+        standalone_success, standalone_time, standalone_output = standalone.result()
+        pytest_success, pytest_time, pytest_output = pytest_run.result()
+    wall_time = time.perf_counter() - started
+    
+    print("\n🧪 Standalone test output:")
+    print(standalone_output)
+    print("\n🧪 Pytest output:")
+    print(pytest_output)
     
     print("\n" + "=" * 60)
     print("📊 Test Results Summary")
     print("=" * 60)
     
     if standalone_success:
-        print("✅ Standalone test: PASSED")
+        print(f"✅ Standalone test: PASSED ({standalone_time:.1f}s)")
     else:
-        print("❌ Standalone test: FAILED")
+        print(f"❌ Standalone test: FAILED ({standalone_time:.1f}s)")
     
     if pytest_success:
-        print("✅ Pytest tests: PASSED")
+        print(f"✅ Pytest tests: PASSED ({pytest_time:.1f}s)")
     else:
-        print("❌ Pytest tests: FAILED")
+        print(f"❌ Pytest tests: FAILED ({pytest_time:.1f}s)")
+    
+    print(f"⏱️ Total wall-clock time: {wall_time:.1f}s "
+          f"(suites back to back would take {standalone_time + pytest_time:.1f}s)")
     
     overall_success = standalone_success or pytest_success
     
@@ -147,13 +230,11 @@ def main():
         print("\n💥 All tests failed!")
         return False
 
-def quick_server_check():
+def quick_server_check(wait=3.0):
     """Quick function to just check if server is running"""
-    try:
-        response = requests.get("http://127.0.0.1:8000/login", timeout=3)
-        return response.status_code == 200
-    except:
-        return False
+    return bool(wait_until(lambda: probe_login_page("http://127.0.0.1:8000", request_timeout=wait) == 200,
+                           timeout=wait, description="server ready",
+                           ignore=(requests.exceptions.RequestException,)))
 
 if __name__ == "__main__":
     try:
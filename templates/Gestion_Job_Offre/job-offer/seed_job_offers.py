@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Bulk seed job offers and measure how the job offer list pages scale
+
+Seeds job offers concurrently through the normal partner UI (one logged-in
+UniLearnTester session per worker thread, spread over the partner
+accounts), stopping at each target volume to measure:
+
+- `admin list`       /admin/job-offer (first page, as the approval path fetches it)
+- `admin list last`  /admin/job-offer?page=N (deepest page, OFFSET cost)
+- `partner list`     /partner/job-offers (first partner account's own offers)
+
+For every page the median/p95 latency, response size and the time to parse
+it and find a seeded offer shown on it (the `approve_job_offer_as_admin`
+lookup, for the first seeded title on that page; `lookup_found` records
+whether it resolved) are recorded. Each run is appended as one JSON line to the history file so
+the curve can be compared across releases. Start from an empty (or at least
+the same) database for comparable curves; volumes count offers seeded by
+this run.
+
+Usage:
+    python seed_job_offers.py --volumes 100,1000,10000 --accounts partners.csv --concurrency 8
+    python seed_job_offers.py --volumes 100,1000 --label v1.4 --history scaling.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from page_parser import ParsedPage
+from perf_report import DEFAULT_REPORT_DIR, percentile
+from test_job_offer_workflow import UniLearnTester, build_job_offer_form, load_partner_accounts
+
+ADMIN_PAGE_SIZE = 25  # AdminJobOfferController::list $limit
+DEFAULT_VOLUMES = (100, 1000, 10000)
+DEFAULT_HISTORY = DEFAULT_REPORT_DIR / 'list_scaling.jsonl'
+
+
+class SeedWorker:
+    """One logged-in partner session creating offers with a reused form token"""
+
+    def __init__(self, base_url: str, account: Dict[str, str]):
+        # Plain session: seeding traffic stays out of perf reports and cassettes
+        self.tester = UniLearnTester(base_url, session=requests.Session(), verbose=False)
+        self.tester.partner_credentials = account
+        self.new_offer_url = f"{self.tester.base_url}/partner/job-offers/new"
+        self.page: Optional[ParsedPage] = None
+
+    def login(self) -> bool:
+        account = self.tester.partner_credentials
+        return self.tester.login_user(account['email'], account['password'], 'Partner')
+
+    def _load_form(self) -> bool:
+        response = self.tester.session.get(self.new_offer_url)
+        page = ParsedPage(response.text) if response.status_code == 200 else None
+        self.page = page if page is not None and page.csrf_token() else None
+        return self.page is not None
+
+    def create(self, title: str) -> bool:
+        """Submit one offer; the form's CSRF token is per session, so the form is fetched once"""
+        for _ in range(2):
+            if self.page is None and not self._load_form():
+                return False
+            offer = dict(self.tester.test_job_offer, title=title)
+            response = self.tester.session.post(
+                self.new_offer_url, data=build_job_offer_form(self.page, offer), allow_redirects=False
+            )
+            if response.status_code in [302, 301]:
+                return True
+            # Token expired or rejected: fetch a fresh form once
+            self.page = None
+        return False
+
+    def close(self):
+        try:
+            self.tester.logout_user()
+        except requests.RequestException:
+            pass
+        self.tester.session.close()
+
+
+def seed_offers(base_url: str, accounts: List[Dict[str, str]], titles: List[str],
+                concurrency: int) -> Dict[str, float]:
+    """Create `titles` over `concurrency` threads, each with its own partner session"""
+    slices = [titles[i::concurrency] for i in range(concurrency)]
+    created = failed = 0
+    lock = threading.Lock()
+
+    def run(index: int):
+        nonlocal created, failed
+        worker = SeedWorker(base_url, accounts[index % len(accounts)])
+        ok = bad = 0
+        try:
+            if not worker.login():
+                bad = len(slices[index])
+            else:
+                for title in slices[index]:
+                    if worker.create(title):
+                        ok += 1
+                    else:
+                        bad += 1
+        except requests.RequestException:
+            bad = len(slices[index]) - ok
+        finally:
+            worker.close()
+        with lock:
+            created += ok
+            failed += bad
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, [i for i, s in enumerate(slices) if s]))
+    elapsed = time.perf_counter() - started
+    return {'created': created, 'failed': failed, 'seconds': round(elapsed, 2),
+            'per_s': round(created / elapsed, 1) if elapsed else 0.0}
+
+
+def first_title_with_prefix(page: ParsedPage, prefix: str) -> Optional[str]:
+    """Title of the first table row on the page whose text starts with `prefix`"""
+    if page.root is None:
+        return None
+    texts = page.root.xpath('//tr//*[starts-with(normalize-space(text()), $prefix)]/text()', prefix=prefix)
+    return ' '.join(texts[0].split()) if texts else None
+
+
+def measure_page(session: requests.Session, url: str, samples: int,
+                 title_prefix: str) -> Dict[str, object]:
+    """
+    Latency, size and parse+lookup time of one list page. The lookup is
+    for a seeded title that is actually on the page (its first one), so
+    `parse_ms` times a hit; `lookup_found` records whether it resolved.
+    """
+    latencies, parse_times = [], []
+    size = status = 0
+    found = False
+    for _ in range(samples):
+        started = time.perf_counter()
+        response = session.get(url)
+        latencies.append(time.perf_counter() - started)
+        size, status = len(response.content), response.status_code
+
+        page = ParsedPage(response.text)
+        title = first_title_with_prefix(page, title_prefix)
+        # Time a fresh parse plus the lookup, as approve_job_offer_as_admin does
+        started = time.perf_counter()
+        page = ParsedPage(response.text)
+        found = bool(title) and page.find_id_for_text(title, r'/job-offers?/(\d+)') is not None
+        parse_times.append(time.perf_counter() - started)
+    return {
+        'status': status,
+        'median_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'bytes': size,
+        'parse_ms': round(statistics.median(parse_times) * 1000, 2),
+        'lookup_found': found,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(history: Path, base_url: str) -> Optional[Dict]:
+    if not history.exists():
+        return None
+    runs = [json.loads(line) for line in history.read_text(encoding='utf-8').splitlines() if line.strip()]
+    runs = [r for r in runs if r.get('base_url') == base_url]
+    return runs[-1] if runs else None
+
+
+def print_curve(points: List[Dict], previous: Optional[Dict]):
+    before = {(p['volume'], p['page']): p['median_ms'] for p in (previous or {}).get('points', [])}
+    print("=" * 78)
+    print(f"{'volume':>8}  {'page':<17}{'median ms':>10}{'p95 ms':>9}{'KiB':>9}{'parse ms':>10}{'prev ms':>10}")
+    for p in points:
+        prev = before.get((p['volume'], p['page']), '-')
+        missed = '' if p['lookup_found'] else '  (lookup missed)'
+        print(f"{p['volume']:>8}  {p['page']:<17}{p['median_ms']:>10}{p['p95_ms']:>9}"
+              f"{p['bytes'] / 1024:>9.1f}{p['parse_ms']:>10}{prev:>10}{missed}")
+
+    # Growth from the smallest to the largest volume, per page
+    print("-" * 78)
+    for page in dict.fromkeys(p['page'] for p in points):
+        series = [p for p in points if p['page'] == page]
+        if len(series) > 1 and series[0]['median_ms']:
+            first, last = series[0], series[-1]
+            print(f"📈 {page}: {first['volume']} → {last['volume']} offers, latency "
+                  f"x{last['median_ms'] / first['median_ms']:.1f}, size x{last['bytes'] / max(first['bytes'], 1):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed job offers and measure list page scaling")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--volumes', default=','.join(map(str, DEFAULT_VOLUMES)),
+                        help='comma separated offer counts to measure at')
+    parser.add_argument('--accounts', default=os.getenv('UNILEARN_PARTNER_ACCOUNTS'),
+                        help='CSV file of partner `email,password` rows')
+    parser.add_argument('--concurrency', type=int, default=8, help='seeding threads')
+    parser.add_argument('--samples', type=int, default=10, help='requests per page and volume')
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY), help='JSON lines history file')
+    parser.add_argument('--label', default='', help='free-form label, e.g. a release')
+    args = parser.parse_args()
+
+    volumes = sorted(int(v) for v in args.volumes.split(','))
+    base = UniLearnTester(args.base_url, session=requests.Session(), verbose=False)
+    accounts = load_partner_accounts(args.accounts) if args.accounts else [base.partner_credentials]
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    admin = UniLearnTester(args.base_url, session=requests.Session(), verbose=False)
+    partner = UniLearnTester(args.base_url, session=requests.Session(), verbose=False)
+    if not admin.login_user(admin.admin_credentials['email'], admin.admin_credentials['password'], 'Admin'):
+        print("❌ Admin login failed")
+        return False
+    if not partner.login_user(accounts[0]['email'], accounts[0]['password'], 'Partner'):
+        print("❌ Partner login failed")
+        return False
+
+    print(f"🌱 Seeding up to {volumes[-1]} job offers over {len(accounts)} partner account(s), "
+          f"{args.concurrency} threads (run {run_id})")
+    points, seeding = [], []
+    seeded = 0
+    for volume in volumes:
+        titles = [f"[seed-{run_id}] Job Offer #{n}" for n in range(seeded + 1, volume + 1)]
+        if titles:
+            result = seed_offers(args.base_url, accounts, titles, args.concurrency)
+            seeded += result['created']
+            seeding.append({'volume': volume, **result})
+            print(f"🌱 {volume}: +{result['created']} offers in {result['seconds']}s "
+                  f"({result['per_s']}/s, {result['failed']} failed)")
+            if result['failed']:
+                print("⚠️ Some offers failed to seed; the volume below is approximate")
+
+        last_page = max(1, math.ceil(seeded / ADMIN_PAGE_SIZE))
+        pages = [
+            ('admin list', admin.session, f"{admin.base_url}/admin/job-offer"),
+            ('admin list last', admin.session, f"{admin.base_url}/admin/job-offer?page={last_page}"),
+            ('partner list', partner.session, f"{partner.base_url}/partner/job-offers"),
+        ]
+        for name, session, url in pages:
+            points.append({'volume': volume, 'page': name,
+                           **measure_page(session, url, args.samples, f"[seed-{run_id}] ")})
+
+    history = Path(args.history)
+    previous = previous_run(history, args.base_url)
+    print_curve(points, previous)
+
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with open(history, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'label': args.label,
+            'git_rev': git_revision(),
+            'base_url': args.base_url,
+            'run_id': run_id,
+            'accounts': len(accounts),
+            'concurrency': args.concurrency,
+            'seeding': seeding,
+            'points': points,
+        }) + '\n')
+    print(f"💾 Appended to {history}")
+
+    admin.logout_user()
+    partner.logout_user()
+    return all(p['status'] == 200 for p in points)
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Offline tests for cassette scrubbing in http_replay
+
+A throwaway local server plays a login and a job offer submission; the
+exchange is recorded through RecordingAdapter, saved, and the cassette file
+must not contain any credential, CSRF token or cookie value.
+
+Run with: pytest test_http_replay.py -v
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_replay import Cassette, ReplayAdapter, ReplayEngine, RecordingAdapter, scrub
+from page_parser import ParsedPage
+
+PASSWORD = 'Sup3r-Secret-Pass'
+EMAIL = 'partner.secret@example.com'
+LOGIN_CSRF = 'login-csrf-8f3a2b1c'
+FORM_CSRF = 'nested-csrf-77d1e9aa'
+SESSION_ID = 'sessid-4c0ffee5ca1ab1e'
+REMEMBER_ME = 'remember-9a8b7c6d5e'
+
+SECRETS = (PASSWORD, EMAIL, LOGIN_CSRF, FORM_CSRF, SESSION_ID, REMEMBER_ME)
+
+
+class FakeUniLearn(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b'', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/login':
+            self.reply(200, f'<form method="post"><input name="_username">'
+                            f'<input type="password" name="_password">'
+                            f'<input type="hidden" name="_csrf_token" value="{LOGIN_CSRF}"></form>'.encode())
+        elif self.path == '/partner/job-offers/new':
+            # The session id also leaks into the page, e.g. a debug toolbar
+            self.reply(200, f'<form name="job_offer_form_type" method="post">'
+                            f'<input name="job_offer_form_type[title]">'
+                            f'<input type="hidden" name="job_offer_form_type[_token]" value="{FORM_CSRF}">'
+                            f'</form><!-- session {SESSION_ID} -->'.encode())
+        else:
+            self.reply(404, b'not found')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/login':
+            self.reply(302, headers=[('Location', '/partner/job-offers/new'),
+                                     ('Set-Cookie', f'PHPSESSID={SESSION_ID}; path=/; HttpOnly'),
+                                     ('Set-Cookie', f'REMEMBERME={REMEMBER_ME}; path=/')])
+        else:
+            self.reply(302, headers=[('Location', '/partner/job-offers')])
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUniLearn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def record_workflow(base_url, cassette):
+    session = requests.Session()
+    session.mount('http://', RecordingAdapter(cassette))
+    session.get(f'{base_url}/login')
+    session.post(f'{base_url}/login', data={'_username': EMAIL, '_password': PASSWORD,
+                                            '_csrf_token': LOGIN_CSRF}, allow_redirects=False)
+    session.get(f'{base_url}/partner/job-offers/new')
+    session.post(f'{base_url}/partner/job-offers/new',
+                 data={'job_offer_form_type[title]': 'Scrub test offer',
+                       'job_offer_form_type[_token]': FORM_CSRF}, allow_redirects=False)
+    session.close()
+
+
+def test_saved_cassette_contains_no_secrets(base_url, tmp_path):
+    cassette = Cassette(tmp_path / 'scrub.json')
+    record_workflow(base_url, cassette)
+
+    # The in-memory recording really holds the secrets...
+    raw = repr(cassette.interactions)
+    assert all(secret in raw for secret in SECRETS)
+
+    # ...and none of them survive into the file
+    cassette.save()
+    saved = cassette.path.read_text(encoding='utf-8')
+    for secret in SECRETS:
+        assert secret not in saved, f"{secret!r} leaked into the cassette"
+    assert 'Scrub test offer' in saved  # ordinary form values are kept
+
+
+def test_placeholders_are_consistent(base_url, tmp_path):
+    cassette = Cassette(tmp_path / 'scrub.json')
+    record_workflow(base_url, cassette)
+    login_get, login_post, form_get, form_post = scrub(cassette.interactions)
+
+    page_token = ParsedPage(login_get['response']['body']).csrf_token()
+    assert page_token.startswith('csrf-token-')
+    assert dict(login_post['request']['form'])['_csrf_token'] == page_token
+
+    form_token = ParsedPage(form_get['response']['body']).fields['job_offer_form_type[_token]'][0].get('value')
+    assert dict(form_post['request']['form'])['job_offer_form_type[_token]'] == form_token
+
+    cookies = dict(value.split(';')[0].split('=', 1)
+                   for name, value in login_post['response']['headers'] if name == 'set-cookie')
+    assert sorted(cookies) == ['PHPSESSID', 'REMEMBERME']
+    assert all(value.startswith('cookie-') for value in cookies.values())
+    assert 'session cookie-' in form_get['response']['body']  # same placeholder in the page
+
+
+def test_scrubbed_cassette_still_replays(base_url, tmp_path):
+    cassette = Cassette(tmp_path / 'scrub.json')
+    record_workflow(base_url, cassette)
+    cassette.save()
+
+    session = requests.Session()
+    session.mount('http://', ReplayAdapter(ReplayEngine(Cassette.load(cassette.path))))
+    page = ParsedPage(session.get(f'{base_url}/login').text)
+    response = session.post(f'{base_url}/login', data={'_username': 'someone', '_password': 'x',
+                                                       '_csrf_token': page.csrf_token()},
+                            allow_redirects=False)
+    assert response.status_code == 302
+    assert session.cookies.get('PHPSESSID', '').startswith('cookie-')
@@ -7,26 +7,98 @@ This test simulates the complete workflow:
 2. Admin logs in and approves the job offer
 
 Requirements:
-    pip install requests beautifulsoup4 pytest
+    pip install requests lxml pytest
 
 Usage:
     python test_job_offer_workflow.py
+
+Every HTTP call is timed; the run writes perf_reports/standalone.json and
+.html and fails if a step's median latency regressed against the stored
+baseline (see perf_report.py).
 """
 
 import requests
-import re
+import csv
 import json
-from typing import Dict, Optional, Tuple
-from bs4 import BeautifulSoup
-import time
+import os
+from typing import Dict, List, Optional, Tuple
+from http_replay import install, suite_label
+from page_parser import ParsedPage
+from perf_report import RecordingSession, finish_run
+from polling import wait_until
 from datetime import datetime
 
+def load_partner_accounts(path: str) -> List[Dict[str, str]]:
+    """Load partner credentials from a CSV file with `email,password` rows"""
+    accounts = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#') or row[0] == 'email':
+                continue
+            accounts.append({'email': row[0].strip(), 'password': row[1].strip()})
+    return accounts
+
+
+def select_partner_account(worker_index: int = 0) -> Optional[Dict[str, str]]:
+    """
+    Pick this process's partner account from the CSV named by
+    UNILEARN_PARTNER_ACCOUNTS, at UNILEARN_ACCOUNT_OFFSET + worker_index.
+    Returns None when no accounts file is configured.
+    """
+    accounts_file = os.getenv('UNILEARN_PARTNER_ACCOUNTS')
+    if not accounts_file:
+        return None
+    accounts = load_partner_accounts(accounts_file)
+    if not accounts:
+        raise ValueError(f"No partner accounts found in {accounts_file}")
+    index = int(os.getenv('UNILEARN_ACCOUNT_OFFSET', '0')) + worker_index
+    if index >= len(accounts):
+        print(f"⚠️ Only {len(accounts)} partner accounts for account #{index + 1} - reusing one")
+    return accounts[index % len(accounts)]
+
+
+# Namespaces this script's offers apart from the pytest suite's `[pytest-<worker>] `
+# titles, which otherwise end in the same `Test Job Offer - <timestamp>`
+STANDALONE_TITLE_PREFIX = '[standalone] '
+
+# (field key, candidate form field names) — field names might be prefixed
+JOB_OFFER_FIELD_MAPPINGS = [
+    ('title', 'job_offer_form_type[title]', 'job_offer[title]'),
+    ('type', 'job_offer_form_type[type]', 'job_offer[type]'),
+    ('location', 'job_offer_form_type[location]', 'job_offer[location]'),
+    ('description', 'job_offer_form_type[description]', 'job_offer[description]'),
+    ('requirements', 'job_offer_form_type[requirements]', 'job_offer[requirements]'),
+    ('salary', 'job_offer_form_type[salary]', 'job_offer[salary]'),
+    ('deadline', 'job_offer_form_type[deadline]', 'job_offer[deadline]')
+]
+
+
+def build_job_offer_form(page: ParsedPage, job_offer: Dict[str, str]) -> Dict[str, str]:
+    """Form data for the job offer creation page: CSRF token plus the offer's fields"""
+    csrf_name, csrf_token = page.csrf_field()
+    form_data = {
+        csrf_name: csrf_token
+    }
+    
+    # Find the actual field names in the form (exact, then partial match)
+    for field_key, *possible_names in JOB_OFFER_FIELD_MAPPINGS:
+        name = page.resolve_field(field_key, possible_names)
+        if name:
+            form_data[name] = job_offer[field_key]
+    return form_data
+
+
 class UniLearnTester:
     """Test class for UniLearn job offer workflow"""
     
-    def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:8000",
+                 session: Optional[requests.Session] = None, verbose: bool = True):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.verbose = verbose
+        # Every call is timed into self.recorder (None for a caller-supplied plain session)
+        # (and recorded/replayed per UNILEARN_HTTP_MODE, see http_replay.py)
+        self.session = session if session is not None else install(RecordingSession(), 'standalone')
+        self.recorder = getattr(self.session, 'recorder', None)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -44,7 +116,7 @@ class UniLearnTester:
         
         # Test data for job offer creation
         self.test_job_offer = {
-            'title': f'Test Job Offer - {datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            'title': f'{STANDALONE_TITLE_PREFIX}Test Job Offer - {datetime.now().strftime("%Y%m%d_%H%M%S")}',
             'type': 'FULL_TIME',
             'location': 'Tunis, Tunisia',
             'description': 'This is a test job offer created by automated testing script.',
@@ -54,47 +126,35 @@ class UniLearnTester:
         }
         
         self.created_job_offer_id = None
+        
+        # Seconds to keep polling for a new offer to show up in the admin list
+        self.visibility_timeout = 10.0
+
+    def _log(self, message: str):
+        """Print progress output unless running quietly (e.g. under load)"""
+        if self.verbose:
+            print(message)
 
     def extract_csrf_token(self, html_content: str, form_name: str = None) -> Optional[str]:
-        """Extract CSRF token from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Look for CSRF token in hidden input field
-        csrf_input = soup.find('input', {'name': '_csrf_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-            
-        # Fallback: look for _token field
-        csrf_input = soup.find('input', {'name': '_token'})
-        if csrf_input:
-            return csrf_input.get('value')
-            
-        # Fallback: look for token in form with specific name
-        if form_name:
-            form = soup.find('form', {'name': form_name})
-            if form:
-                csrf_input = form.find('input', {'name': '_csrf_token'})
-                if csrf_input:
-                    return csrf_input.get('value')
-        
-        return None
+        """Extract CSRF token from HTML content (`_csrf_token`, `_token` or `<form>[_token]`)"""
+        return ParsedPage(html_content).csrf_token()
 
     def login_user(self, email: str, password: str, user_type: str) -> bool:
         """Login a user and return success status"""
-        print(f"🔐 Logging in {user_type}: {email}")
+        self._log(f"🔐 Logging in {user_type}: {email}")
         
         # Get login page to retrieve CSRF token
         login_url = f"{self.base_url}/login"
         response = self.session.get(login_url)
         
         if response.status_code != 200:
-            print(f"❌ Failed to access login page: {response.status_code}")
+            self._log(f"❌ Failed to access login page: {response.status_code}")
             return False
         
         # Extract CSRF token
         csrf_token = self.extract_csrf_token(response.text)
         if not csrf_token:
-            print("❌ Could not extract CSRF token from login page")
+            self._log("❌ Could not extract CSRF token from login page")
             return False
         
         # Prepare login data
@@ -109,93 +169,59 @@ class UniLearnTester:
         
         # Check if login was successful (should redirect)
         if response.status_code in [302, 301]:
-            print(f"✅ {user_type} login successful")
+            self._log(f"✅ {user_type} login successful")
             return True
         else:
-            print(f"❌ {user_type} login failed: {response.status_code}")
-            print(f"Response content: {response.text[:500]}")
+            self._log(f"❌ {user_type} login failed: {response.status_code}")
+            self._log(f"Response content: {response.text[:500]}")
             return False
 
     def logout_user(self):
         """Logout the current user"""
         logout_url = f"{self.base_url}/logout"
         response = self.session.get(logout_url)
-        print("🚪 User logged out")
+        self._log("🚪 User logged out")
 
     def create_job_offer_as_partner(self) -> bool:
         """Create a job offer as partner"""
-        print("📝 Creating job offer as partner...")
+        self._log("📝 Creating job offer as partner...")
         
         # Access job offer creation page
         new_offer_url = f"{self.base_url}/partner/job-offers/new"
         response = self.session.get(new_offer_url)
         
         if response.status_code != 200:
-            print(f"❌ Failed to access job offer creation page: {response.status_code}")
+            self._log(f"❌ Failed to access job offer creation page: {response.status_code}")
             return False
         
-        # Extract CSRF token from form
-        csrf_token = self.extract_csrf_token(response.text)
-        if not csrf_token:
-            print("❌ Could not extract CSRF token from job offer form")
+        # Parse the page once for the CSRF token and field names
+        page = ParsedPage(response.text)
+        csrf_field = page.csrf_field()
+        if not csrf_field or not csrf_field[1]:
+            self._log("❌ Could not extract CSRF token from job offer form")
             return False
         
-        # Parse form to get proper field names
-        soup = BeautifulSoup(response.text, 'html.parser')
-        form = soup.find('form')
-        
-        if not form:
-            print("❌ Could not find job offer form")
+        if not page.forms:
+            self._log("❌ Could not find job offer form")
             return False
         
-        # Prepare form data (field names might be prefixed)
-        form_data = {
-            '_token': csrf_token
-        }
-        
-        # Try different possible field name formats
-        field_mappings = [
-            ('title', 'job_offer_form_type[title]', 'job_offer[title]'),
-            ('type', 'job_offer_form_type[type]', 'job_offer[type]'),
-            ('location', 'job_offer_form_type[location]', 'job_offer[location]'),
-            ('description', 'job_offer_form_type[description]', 'job_offer[description]'),
-            ('requirements', 'job_offer_form_type[requirements]', 'job_offer[requirements]'),
-            ('salary', 'job_offer_form_type[salary]', 'job_offer[salary]'),
-            ('deadline', 'job_offer_form_type[deadline]', 'job_offer[deadline]')
-        ]
-        
-        # Find the actual field names in the form
-        for field_key, *possible_names in field_mappings:
-            field_found = False
-            for name in possible_names:
-                if soup.find('input', {'name': name}) or soup.find('textarea', {'name': name}) or soup.find('select', {'name': name}):
-                    form_data[name] = self.test_job_offer[field_key]
-                    field_found = True
-                    break
-            
-            if not field_found:
-                # Try to find by partial name match
-                for input_elem in soup.find_all(['input', 'textarea', 'select']):
-                    name = input_elem.get('name', '')
-                    if field_key in name.lower():
-                        form_data[name] = self.test_job_offer[field_key]
-                        break
+        form_data = build_job_offer_form(page, self.test_job_offer)
         
-        print(f"📤 Submitting job offer with data: {form_data}")
+        self._log(f"📤 Submitting job offer with data: {form_data}")
         
         # Submit form
         response = self.session.post(new_offer_url, data=form_data, allow_redirects=False)
         
         if response.status_code in [302, 301]:
-            print("✅ Job offer created successfully")
+            self._log("✅ Job offer created successfully")
             
             # Try to extract job offer ID from redirect or session
             # This might require checking the partner job offer list
             self._extract_created_job_offer_id()
             return True
         else:
-            print(f"❌ Failed to create job offer: {response.status_code}")
-            print(f"Response content: {response.text[:1000]}")
+            self._log(f"❌ Failed to create job offer: {response.status_code}")
+            self._log(f"Response content: {response.text[:1000]}")
             return False
 
     def _extract_created_job_offer_id(self):
@@ -206,82 +232,82 @@ class UniLearnTester:
             response = self.session.get(list_url)
             
             if response.status_code == 200:
-                # Look for job offer with our test title
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Look for links or data attributes containing job offer IDs
-                for link in soup.find_all('a', href=True):
-                    if self.test_job_offer['title'] in link.get_text():
-                        href = link['href']
-                        # Extract ID from URL like /job-offers/123 or /partner/job-offers/123
-                        match = re.search(r'/job-offers/(\d+)', href)
-                        if match:
-                            self.created_job_offer_id = match.group(1)
-                            print(f"📋 Found created job offer ID: {self.created_job_offer_id}")
-                            return
+                # Look for a link with our test title, e.g. /partner/job-offers/123
+                job_offer_id = ParsedPage(response.text).find_id_for_text(
+                    self.test_job_offer['title'], r'/job-offers/(\d+)'
+                )
+                if job_offer_id:
+                    self.created_job_offer_id = job_offer_id
+                    self._log(f"📋 Found created job offer ID: {self.created_job_offer_id}")
                             
         except Exception as e:
-            print(f"⚠️ Could not extract job offer ID: {e}")
+            self._log(f"⚠️ Could not extract job offer ID: {e}")
 
     def approve_job_offer_as_admin(self) -> bool:
         """Approve the created job offer as admin"""
-        print("✅ Attempting to approve job offer as admin...")
+        self._log("✅ Attempting to approve job offer as admin...")
         
-        # Access admin job offer list
+        # Poll the admin job offer list until our offer and its approve form show up
         admin_list_url = f"{self.base_url}/admin/job-offer"
-        response = self.session.get(admin_list_url)
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to access admin job offer list: {response.status_code}")
+        last_status = {}
+        
+        def approve_form_visible():
+            response = self.session.get(admin_list_url)
+            last_status['code'] = response.status_code
+            if response.status_code != 200:
+                return None
+            page = ParsedPage(response.text)
+            
+            # First, try to use the extracted ID, else search for the row holding our title
+            job_offer_id = self.created_job_offer_id or page.find_id_for_text(
+                self.test_job_offer['title'], r'/admin/job-offer/(\d+)'
+            )
+            approve_form = page.find_form(f'/{job_offer_id}/approve') if job_offer_id else None
+            if approve_form and approve_form.get('_token'):
+                return job_offer_id, approve_form.get('_token')
+            return None
+        
+        result = wait_until(approve_form_visible, timeout=self.visibility_timeout,
+                            description="job offer visible in admin list",
+                            ignore=(requests.RequestException,))
+        self._log(result.summary())
+        
+        if not result:
+            if last_status.get('code') not in (None, 200):
+                self._log(f"❌ Failed to access admin job offer list: {last_status['code']}")
+            else:
+                self._log("❌ Could not find the created job offer or its approve form in admin list")
             return False
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the job offer in the list (look for our test title or ID)
-        job_offer_id = None
-        
-        # First, try to use the extracted ID
-        if self.created_job_offer_id:
-            job_offer_id = self.created_job_offer_id
-        else:
-            # Search for the job offer by title
-            for element in soup.find_all(text=True):
-                if self.test_job_offer['title'] in str(element):
-                    # Try to find nearby ID information
-                    parent = element.parent if element.parent else soup
-                    for link in parent.find_all('a', href=True):
-                        match = re.search(r'/admin/job-offer/(\d+)', link['href'])
-                        if match:
-                            job_offer_id = match.group(1)
-                            break
-                    if job_offer_id:
-                        break
-        
+        job_offer_id, csrf_token = result.value
+        self._log(f"🎯 Found job offer to approve: ID {job_offer_id}")
+        return self._submit_approval(job_offer_id, csrf_token)
+
+    def approve_job_offer_from_detail_page(self) -> bool:
+        """
+        Approve the created job offer via its admin detail page.
+
+        Needs the ID found on the partner list after creation. Unlike the
+        admin list, which only shows the newest page of offers, the detail
+        page holds the approve form regardless of how many offers exist.
+        """
+        job_offer_id = self.created_job_offer_id
         if not job_offer_id:
-            print("❌ Could not find the created job offer in admin list")
+            self._log("❌ Created job offer ID unknown; cannot open its admin page")
             return False
         
-        print(f"🎯 Found job offer to approve: ID {job_offer_id}")
-        
-        # Find the approve form for this job offer
-        approve_forms = soup.find_all('form')
-        approve_form = None
-        csrf_token = None
-        
-        for form in approve_forms:
-            action = form.get('action', '')
-            if f'/{job_offer_id}/approve' in action:
-                approve_form = form
-                csrf_token_input = form.find('input', {'name': '_token'})
-                if csrf_token_input:
-                    csrf_token = csrf_token_input.get('value')
-                break
-        
-        if not approve_form or not csrf_token:
-            print("❌ Could not find approve form or CSRF token")
+        response = self.session.get(f"{self.base_url}/admin/job-offer/{job_offer_id}")
+        if response.status_code != 200:
+            self._log(f"❌ Failed to access admin job offer {job_offer_id}: {response.status_code}")
             return False
         
-        # Submit approval
+        approve_form = ParsedPage(response.text).find_form(f'/{job_offer_id}/approve')
+        if not approve_form or not approve_form.get('_token'):
+            self._log(f"❌ No approve form on admin job offer {job_offer_id}")
+            return False
+        return self._submit_approval(job_offer_id, approve_form.get('_token'))
+
+    def _submit_approval(self, job_offer_id: str, csrf_token: str) -> bool:
         approve_url = f"{self.base_url}/admin/job-offer/{job_offer_id}/approve"
         approve_data = {
             '_token': csrf_token
@@ -290,17 +316,17 @@ class UniLearnTester:
         response = self.session.post(approve_url, data=approve_data, allow_redirects=False)
         
         if response.status_code in [302, 301]:
-            print("✅ Job offer approved successfully")
+            self._log("✅ Job offer approved successfully")
             return True
         else:
-            print(f"❌ Failed to approve job offer: {response.status_code}")
-            print(f"Response content: {response.text[:500]}")
+            self._log(f"❌ Failed to approve job offer: {response.status_code}")
+            self._log(f"Response content: {response.text[:500]}")
             return False
 
     def run_full_workflow_test(self) -> bool:
         """Run the complete workflow test"""
-        print("🚀 Starting UniLearn Job Offer Workflow Test")
-        print("=" * 60)
+        self._log("🚀 Starting UniLearn Job Offer Workflow Test")
+        self._log("=" * 60)
         
         try:
             # Step 1: Partner login and job offer creation
@@ -317,9 +343,6 @@ class UniLearnTester:
             # Logout partner
             self.logout_user()
             
-            # Wait a moment for the system to process
-            time.sleep(2)
-            
             # Step 2: Admin login and approval
             if not self.login_user(
                 self.admin_credentials['email'], 
@@ -331,12 +354,12 @@ class UniLearnTester:
             if not self.approve_job_offer_as_admin():
                 return False
             
-            print("=" * 60)
-            print("🎉 All workflow tests completed successfully!")
+            self._log("=" * 60)
+            self._log("🎉 All workflow tests completed successfully!")
             return True
             
         except Exception as e:
-            print(f"💥 Test failed with exception: {e}")
+            self._log(f"💥 Test failed with exception: {e}")
             return False
         
         finally:
@@ -355,10 +378,18 @@ class UniLearnTester:
 def main():
     """Main function to run the test"""
     tester = UniLearnTester()
+    partner = select_partner_account()
+    if partner:
+        tester.partner_credentials = partner
     
     try:
         success = tester.run_full_workflow_test()
         
+        print()
+        if not finish_run(tester.recorder, suite_label('standalone'), base_url=tester.base_url, passed=success):
+            print("\n❌ TEST FAILED: performance regressed against the baseline")
+            exit(1)
+        
         if success:
             print("\n✅ TEST PASSED: Job offer workflow completed successfully")
             exit(0)
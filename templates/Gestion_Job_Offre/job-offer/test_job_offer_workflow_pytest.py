@@ -5,53 +5,102 @@ Pytest version of the UniLearn Job Offer Workflow Test
 Usage:
     pytest test_job_offer_workflow_pytest.py -v
     pytest test_job_offer_workflow_pytest.py -v -s  # with output
+
+    # Reuse partner/admin logins across runs (cookies stored on disk)
+    UNILEARN_AUTH_CACHE_DIR=.auth_cache pytest test_job_offer_workflow_pytest.py -v
+
+Every run also writes perf_reports/pytest.json and .html and fails when a
+step's median latency regressed against perf_reports/pytest.baseline.json.
 """
 
+import json
+import os
 import pytest
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+from pathlib import Path
 import time
-import re
+
+from http_replay import install, suite_label
+from page_parser import ParsedPage
+from perf_report import PerfRecorder, RecordingSession, finish_run
+from polling import wait_until
+from test_job_offer_workflow import select_partner_account
 
 
 @pytest.fixture(scope="session")
 def test_config():
-    """Test configuration fixture"""
-    return {
+    """
+    Test configuration fixture
+
+    Under pytest-xdist every worker (gw0, gw1, ...) gets its own partner
+    account from UNILEARN_PARTNER_ACCOUNTS and its own job offer title
+    prefix, so parallel workers never touch each other's offers.
+    """
+    worker = os.getenv('PYTEST_XDIST_WORKER', '')
+    worker_index = int(worker[2:]) if worker.startswith('gw') else 0
+    config = {
         'base_url': 'http://127.0.0.1:8000',
         'partner_email': 'amri.dhia21@gmail.com',
         'partner_password': 'C*RRcdS73glX',
         'admin_email': 'admin@unilearn.com', 
-        'admin_password': 'admin123'
+        'admin_password': 'admin123',
+        'worker': worker or 'main',
+        'title_prefix': f"[pytest-{worker or 'main'}] "
     }
+    partner = select_partner_account(worker_index)
+    if partner:
+        config['partner_email'] = partner['email']
+        config['partner_password'] = partner['password']
+    return config
 
 
-@pytest.fixture
-def test_session():
-    """Create a test session"""
-    session = requests.Session()
+# Every HTTP call made through make_session() sessions, for the run's performance report
+PERF_RECORDER = PerfRecorder()
+
+
+def suite_name() -> str:
+    """Suite name for reports and cassettes; xdist workers get their own"""
+    worker = os.getenv('PYTEST_XDIST_WORKER', '')
+    return f'pytest-{worker}' if worker else 'pytest'
+
+
+@pytest.fixture(scope="session", autouse=True)
+def perf_report(request, test_config):
+    """
+    Write the run's per-step performance report when the session ends and
+    fail the run if a step's median latency regressed against the baseline
+    (see perf_report.finish_run). xdist workers report separately.
+    """
+    yield PERF_RECORDER
+    suite = suite_label(suite_name())
+    passed = request.session.testsfailed == 0
+    if PERF_RECORDER.calls and not finish_run(PERF_RECORDER, suite, base_url=test_config['base_url'],
+                                              passed=passed):
+        pytest.fail(f"Performance regressed against the {suite} baseline", pytrace=False)
+
+
+def make_session() -> requests.Session:
+    """Create a recording requests session with the browser-like headers the tests use"""
+    session = install(RecordingSession(PERF_RECORDER), suite_name())
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
     return session
 
 
+@pytest.fixture
+def test_session():
+    """Create a test session"""
+    return make_session()
+
+
 def extract_csrf_token(html_content: str) -> str:
     """Extract CSRF token from HTML content"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Try _csrf_token first
-    csrf_input = soup.find('input', {'name': '_csrf_token'})
-    if csrf_input:
-        return csrf_input.get('value')
-    
-    # Fallback to _token
-    csrf_input = soup.find('input', {'name': '_token'})
-    if csrf_input:
-        return csrf_input.get('value')
-        
-    raise ValueError("CSRF token not found")
+    token = ParsedPage(html_content).csrf_token()
+    if token is None:
+        raise ValueError("CSRF token not found")
+    return token
 
 
 def login_user(session, base_url: str, email: str, password: str) -> bool:
@@ -81,6 +130,148 @@ def logout_user(session, base_url: str):
     session.get(logout_url)
 
 
+class AuthSessionCache:
+    """
+    Logged-in sessions keyed by role, shared by every test in the run.
+
+    Each role logs in at most once per run (Symfony's password hashing makes
+    logins expensive). When `cache_dir` is set the cookie jar is also saved
+    to disk and reused by later runs. A session is checked against a
+    role-protected page when loaded from disk and again once it is older
+    than `revalidate_after` seconds. If it has expired, the cache logs in
+    again.
+    """
+
+    PROTECTED_PAGES = {
+        'partner': '/partner/job-offers',
+        'admin': '/admin/job-offer',
+    }
+
+    def __init__(self, config: dict, cache_dir: str = None, revalidate_after: float = 300.0):
+        self.config = config
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.revalidate_after = revalidate_after
+        self.logins = 0
+        self._sessions = {}
+        self._validated_at = {}
+
+    def get(self, role: str) -> requests.Session:
+        """Return a logged-in session for `role`, logging in only if needed"""
+        session = self._sessions.get(role)
+        if session is None:
+            session = self._load(role)
+            if session is not None and not self._is_valid(session, role):
+                session = None
+        elif time.monotonic() - self._validated_at[role] > self.revalidate_after:
+            if not self._is_valid(session, role):
+                session = None
+
+        if session is None:
+            session = self._login(role)
+        self._sessions[role] = session
+        return session
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+
+    def _is_valid(self, session: requests.Session, role: str) -> bool:
+        # An expired session is redirected to /login instead of getting a 200
+        response = session.get(
+            f"{self.config['base_url']}{self.PROTECTED_PAGES[role]}",
+            allow_redirects=False,
+        )
+        if response.status_code == 200:
+            self._validated_at[role] = time.monotonic()
+            return True
+        return False
+
+    def _login(self, role: str) -> requests.Session:
+        session = make_session()
+        success = login_user(
+            session,
+            self.config['base_url'],
+            self.config[f'{role}_email'],
+            self.config[f'{role}_password']
+        )
+        assert success, f"{role.capitalize()} login failed"
+        self.logins += 1
+        self._validated_at[role] = time.monotonic()
+        self._save(role, session)
+        return session
+
+    def _cache_file(self, role: str) -> Path:
+        # One file per xdist worker so parallel workers never share a jar
+        return self.cache_dir / f"{role}_{self.config.get('worker', 'main')}_cookies.json"
+
+    def _load(self, role: str):
+        if self.cache_dir is None or not self._cache_file(role).exists():
+            return None
+        try:
+            data = json.loads(self._cache_file(role).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        # Cookies are only valid for the server and account they came from
+        if data.get('base_url') != self.config['base_url'] or \
+                data.get('email') != self.config[f'{role}_email']:
+            return None
+
+        session = make_session()
+        for cookie in data.get('cookies', []):
+            if cookie.get('expires') and cookie['expires'] < time.time():
+                continue
+            session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/'),
+                expires=cookie.get('expires'), secure=cookie.get('secure', False),
+            )
+        return session
+
+    def _save(self, role: str, session: requests.Session):
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            'base_url': self.config['base_url'],
+            'email': self.config[f'{role}_email'],
+            'saved_at': time.time(),
+            'cookies': [
+                {
+                    'name': c.name, 'value': c.value, 'domain': c.domain,
+                    'path': c.path, 'expires': c.expires, 'secure': c.secure,
+                }
+                for c in session.cookies
+            ],
+        }
+        # Session cookies are credentials; create the file private to the user so
+        # they are never readable by others, not even between write and chmod
+        fd = os.open(self._cache_file(role), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode only applies on creation; tighten a jar left by an older run
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, indent=2))
+
+
+@pytest.fixture(scope="session")
+def auth_cache(test_config):
+    """Run-wide cache of logged-in sessions (see AuthSessionCache)"""
+    cache = AuthSessionCache(test_config, os.getenv('UNILEARN_AUTH_CACHE_DIR'))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def partner_session(auth_cache):
+    """Logged-in partner session, shared across tests"""
+    return auth_cache.get('partner')
+
+
+@pytest.fixture
+def admin_session(auth_cache):
+    """Logged-in admin session, shared across tests"""
+    return auth_cache.get('admin')
+
+
 class TestJobOfferWorkflow:
     """Test class for job offer workflow"""
     
@@ -106,35 +297,25 @@ class TestJobOfferWorkflow:
         assert success, "Admin login failed"
         logout_user(test_session, test_config['base_url'])
     
-    def test_partner_create_job_offer(self, test_config, test_session):
+    def test_partner_create_job_offer(self, test_config, partner_session):
         """Test job offer creation by partner"""
-        # Login as partner
-        login_success = login_user(
-            test_session,
-            test_config['base_url'],
-            test_config['partner_email'],
-            test_config['partner_password']
-        )
-        assert login_success, "Partner login failed"
-        
         # Access job offer creation page
         new_offer_url = f"{test_config['base_url']}/partner/job-offers/new"
-        response = test_session.get(new_offer_url)
+        response = partner_session.get(new_offer_url)
         assert response.status_code == 200, f"Failed to access job offer creation page: {response.status_code}"
         
-        # Extract CSRF token
-        csrf_token = extract_csrf_token(response.text)
+        # Parse the page once for the CSRF token and field names
+        page = ParsedPage(response.text)
+        csrf_field = page.csrf_field()
+        assert csrf_field, "CSRF token not found"
         
         # Prepare test job offer data
-        test_title = f"Test Job Offer - {datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        test_title = f"{test_config['title_prefix']}Test Job Offer - {datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # Parse form to find field names
-        soup = BeautifulSoup(response.text, 'html.parser')
-        form = soup.find('form')
-        assert form, "Job offer form not found"
+        assert page.forms, "Job offer form not found"
         
         # Build form data based on discovered field names
-        form_data = {'_token': csrf_token}
+        form_data = dict([csrf_field])
         
         # Try to find and populate form fields
         fields_to_find = {
@@ -152,72 +333,41 @@ class TestJobOfferWorkflow:
                 field_key
             ]
             
-            field_found = False
-            for name in possible_names:
-                if soup.find(['input', 'textarea', 'select'], {'name': name}):
-                    form_data[name] = field_value
-                    field_found = True
-                    break
-            
-            if not field_found:
-                # Try partial match
-                for elem in soup.find_all(['input', 'textarea', 'select']):
-                    name = elem.get('name', '')
-                    if field_key in name.lower():
-                        form_data[name] = field_value
-                        break
+            # Exact names first, then partial match
+            name = page.resolve_field(field_key, possible_names)
+            if name:
+                form_data[name] = field_value
         
         # Submit form
-        response = test_session.post(new_offer_url, data=form_data, allow_redirects=False)
+        response = partner_session.post(new_offer_url, data=form_data, allow_redirects=False)
         
         # Should redirect on success
         creation_success = response.status_code in [302, 301]
         
-        logout_user(test_session, test_config['base_url'])
-        
         assert creation_success, f"Job offer creation failed: {response.status_code}"
     
-    def test_admin_access_job_offers(self, test_config, test_session):
+    def test_admin_access_job_offers(self, test_config, admin_session):
         """Test admin access to job offers list"""
-        # Login as admin
-        login_success = login_user(
-            test_session,
-            test_config['base_url'],
-            test_config['admin_email'],
-            test_config['admin_password']
-        )
-        assert login_success, "Admin login failed"
-        
         # Access admin job offer list
         admin_list_url = f"{test_config['base_url']}/admin/job-offer"
-        response = test_session.get(admin_list_url)
-        
-        logout_user(test_session, test_config['base_url'])
+        response = admin_session.get(admin_list_url)
         
         assert response.status_code == 200, f"Failed to access admin job offer list: {response.status_code}"
     
     @pytest.mark.slow
-    def test_complete_workflow(self, test_config, test_session):
+    def test_complete_workflow(self, test_config, partner_session, admin_session):
         """Test the complete job offer workflow - partner creates, admin approves"""
         # Step 1: Partner creates job offer
-        login_success = login_user(
-            test_session,
-            test_config['base_url'], 
-            test_config['partner_email'],
-            test_config['partner_password']
-        )
-        assert login_success, "Partner login failed"
-        
-        # Create job offer
         new_offer_url = f"{test_config['base_url']}/partner/job-offers/new"
-        response = test_session.get(new_offer_url)
+        response = partner_session.get(new_offer_url)
         assert response.status_code == 200
         
-        csrf_token = extract_csrf_token(response.text)
-        test_title = f"E2E Test Job Offer - {datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        page = ParsedPage(response.text)
+        csrf_field = page.csrf_field()
+        assert csrf_field, "CSRF token not found"
+        test_title = f"{test_config['title_prefix']}E2E Test Job Offer - {datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        form_data = {'_token': csrf_token}
+        form_data = dict([csrf_field])
         
         # Quick field mapping for the test
         fields = {
@@ -228,41 +378,26 @@ class TestJobOfferWorkflow:
         }
         
         for field_key, field_value in fields.items():
-            # Find field name in form
-            for elem in soup.find_all(['input', 'textarea', 'select']):
-                name = elem.get('name', '')
-                if field_key in name.lower() and 'job_offer' in name:
-                    form_data[name] = field_value
-                    break
+            # Find field name in form; exact names first, since e.g. 'type'
+            # is also a substring of 'job_offer_form_type[title]'
+            name = page.resolve_field(field_key, [f'job_offer_form_type[{field_key}]',
+                                                  f'job_offer[{field_key}]'])
+            if name:
+                form_data[name] = field_value
         
-        response = test_session.post(new_offer_url, data=form_data, allow_redirects=False)
+        response = partner_session.post(new_offer_url, data=form_data, allow_redirects=False)
         assert response.status_code in [302, 301], "Job offer creation failed"
         
-        logout_user(test_session, test_config['base_url'])
-        time.sleep(1)  # Small delay
-        
-        # Step 2: Admin approves job offer
-        login_success = login_user(
-            test_session,
-            test_config['base_url'],
-            test_config['admin_email'],
-            test_config['admin_password']
-        )
-        assert login_success, "Admin login failed"
-        
-        # Find the created job offer in admin list
+        # Step 2: Admin sees the new job offer (separate cached admin session)
         admin_list_url = f"{test_config['base_url']}/admin/job-offer"
-        response = test_session.get(admin_list_url)
-        assert response.status_code == 200
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
         
-        # Look for the job offer (this is simplified - in real test you'd need more robust ID extraction)
-        # For now, just verify admin can access the list
-        assert "job" in response.text.lower(), "Job offers not visible in admin interface"
+        def offer_listed():
+            response = admin_session.get(admin_list_url)
+            return response.status_code == 200 and ParsedPage(response.text).contains_text(test_title)
         
-        logout_user(test_session, test_config['base_url'])
-
+        result = wait_until(offer_listed, timeout=10, description="job offer visible in admin list")
+        print(result.summary())
+        assert result, f"Job offer not visible in admin interface after {result.elapsed:.2f}s"
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Offline tests for ParsedPage lookups
+
+Run with: pytest test_page_parser.py -v
+"""
+
+from page_parser import ParsedPage
+
+ADMIN_LIST = """
+<table><tbody>
+  <tr>
+    <td><strong>[pytest-gw0] Test Job Offer - 20260101_120000</strong></td>
+    <td><a href="/admin/job-offer/3">View</a></td>
+  </tr>
+  <tr>
+    <td><strong>[standalone] Test Job Offer - 20260101_120000</strong></td>
+    <td><form action="/admin/job-offer/2/approve" method="post"></form></td>
+  </tr>
+  <tr>
+    <td><strong>
+        [seed-1] Job Offer #10
+    </strong></td>
+    <td><a href="/admin/job-offer/10">View</a></td>
+  </tr>
+  <tr>
+    <td><strong>[seed-1] Job Offer #1</strong></td>
+    <td><a href="/admin/job-offer/1">View</a></td>
+  </tr>
+</tbody></table>
+<a href="/job-offers/7">Linked Offer</a>
+<a href="/job-offers/8">Linked Offer (copy)</a>
+"""
+
+ID = r'/admin/job-offer/(\d+)'
+
+
+def test_row_match_needs_the_whole_title():
+    page = ParsedPage(ADMIN_LIST)
+    assert page.find_id_for_text('[standalone] Test Job Offer - 20260101_120000', ID) == '2'
+    assert page.find_id_for_text('[pytest-gw0] Test Job Offer - 20260101_120000', ID) == '3'
+    # A bare (unprefixed) title is a substring of both rows above
+    assert page.find_id_for_text('Test Job Offer - 20260101_120000', ID) is None
+
+
+def test_row_match_does_not_take_a_longer_number():
+    page = ParsedPage(ADMIN_LIST)
+    assert page.find_id_for_text('[seed-1] Job Offer #1', ID) == '1'
+    assert page.find_id_for_text('[seed-1] Job Offer #10', ID) == '10'
+
+
+def test_link_match_needs_the_whole_text():
+    page = ParsedPage(ADMIN_LIST)
+    assert page.find_id_for_text('Linked Offer', r'/job-offers/(\d+)') == '7'
+    assert page.find_id_for_text('Linked', r'/job-offers/(\d+)') is None
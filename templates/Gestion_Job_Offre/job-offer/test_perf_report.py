@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the performance report baseline rules
+
+Run with: pytest test_perf_report.py -v
+"""
+
+import json
+
+import pytest
+
+from perf_report import CallRecord, PerfRecorder, finish_run
+
+
+@pytest.fixture
+def perf_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('UNILEARN_PERF_DIR', str(tmp_path))
+    monkeypatch.delenv('UNILEARN_PERF_UPDATE_BASELINE', raising=False)
+    return tmp_path
+
+
+def recorder(*calls):
+    rec = PerfRecorder()
+    for step, status, elapsed_ms in calls:
+        rec.calls.append(CallRecord(step=step, method='GET', path=f'/{step}', status=status,
+                                    elapsed_ms=elapsed_ms, request_bytes=0, response_bytes=100))
+    return rec
+
+
+def quiet(_message):
+    pass
+
+
+def test_passing_run_seeds_baseline(perf_dir):
+    assert finish_run(recorder(('admin list', 200, 50.0)), 'suite', log=quiet, passed=True)
+    assert (perf_dir / 'suite.baseline.json').exists()
+
+
+def test_failed_run_does_not_seed_baseline(perf_dir):
+    assert finish_run(recorder(('admin list', 200, 5.0)), 'suite', log=quiet, passed=False)
+    assert not (perf_dir / 'suite.baseline.json').exists()
+
+
+@pytest.mark.parametrize('status', [500, None])
+def test_step_errors_do_not_seed_baseline(perf_dir, status):
+    finish_run(recorder(('admin list', 200, 50.0), ('approve', status, 2.0)), 'suite', log=quiet)
+    assert not (perf_dir / 'suite.baseline.json').exists()
+
+
+def test_update_keeps_old_baseline_when_run_failed(perf_dir, monkeypatch):
+    finish_run(recorder(('admin list', 200, 50.0)), 'suite', log=quiet, passed=True)
+    monkeypatch.setenv('UNILEARN_PERF_UPDATE_BASELINE', '1')
+    finish_run(recorder(('admin list', 200, 5.0)), 'suite', log=quiet, passed=False)
+
+    baseline = json.loads((perf_dir / 'suite.baseline.json').read_text(encoding='utf-8'))
+    assert baseline['steps']['admin list']['median_ms'] == 50.0
+
+
+def test_regression_against_baseline_fails_run(perf_dir):
+    finish_run(recorder(('admin list', 200, 50.0)), 'suite', log=quiet, passed=True)
+    assert not finish_run(recorder(('admin list', 200, 100.0)), 'suite', log=quiet, passed=True)